@@ -0,0 +1,55 @@
+"""
+Cold-start benchmark of the GCS : module import times and time from interpreter start to the first HEARTBEAT of the vehicle.
+Every run happens in a fresh interpreter so nothing is already imported or cached.
+
+    python benchmark_startup.py udpin:0.0.0.0:14550 --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Runs in the child interpreter, every time is measured from its start
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+times = {}
+for module in ("command_protocol", "controller", "flight_conditions"):
+    __import__(module)
+    times["import " + module] = time.perf_counter() - start
+if len(sys.argv) > 1:
+    from command_protocol import Protocol
+    protocol = Protocol(sys.argv[1], int(sys.argv[2]))
+    times["connection open"] = time.perf_counter() - start
+    heartbeat = protocol.wait_message("HEARTBEAT", float(sys.argv[3]))
+    if heartbeat is not None:
+        times["first HEARTBEAT"] = time.perf_counter() - start
+print(json.dumps(times))
+"""
+
+
+def run_once(port, baud, timeout):
+    args = [sys.executable, "-c", CHILD] + ([port, str(baud), str(timeout)] if port else [])
+    output = subprocess.run(args, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GCS cold-start time.")
+    parser.add_argument("port", nargs="?", help="MAVLink connection string, imports only if omitted")
+    parser.add_argument("--baud", type=int, default=57600)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for the HEARTBEAT")
+    args = parser.parse_args()
+
+    runs = [run_once(args.port, args.baud, args.timeout) for i in range(args.runs)]
+    print(f"{'stage (cumulative, ms)':<32} {'min':>8} {'median':>8} {'max':>8}")
+    for stage in runs[0]:
+        values = [run[stage] * 1000 for run in runs if stage in run]
+        print(f"{stage:<32} {min(values):>8.1f} {statistics.median(values):>8.1f} {max(values):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
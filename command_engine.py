@@ -0,0 +1,179 @@
+"""
+Non-blocking MAV_CMD engine. The command microservice is documented at https://mavlink.io/en/services/command.html
+
+Every command sent through the engine returns a CommandFuture that resolves on the matching COMMAND_ACK.
+Acks are correlated by command id and by the system / component that sent them, so several commands can be in flight at once.
+A command without ack is retransmitted with an incremented confirmation field, MAV_RESULT_IN_PROGRESS acks keep it alive.
+The ack timeout runs from the moment the frame is actually written, not from when it is queued : on a busy or shaped link a command
+waiting in the outbound queue is neither timed out nor queued a second time.
+"""
+
+import functools
+import threading
+import time
+from concurrent.futures import Future
+from mavlink_dialect import mavutil
+
+MAV_RESULT_STATUS = {
+    mavutil.mavlink.MAV_RESULT_ACCEPTED: "Accepted",
+    mavutil.mavlink.MAV_RESULT_TEMPORARILY_REJECTED: "Temporarily rejected.",
+    mavutil.mavlink.MAV_RESULT_DENIED: "Denied",
+    mavutil.mavlink.MAV_RESULT_UNSUPPORTED: "Unsupported",
+    mavutil.mavlink.MAV_RESULT_FAILED: "Failed",
+    mavutil.mavlink.MAV_RESULT_IN_PROGRESS: "In progress",
+    6: "Cancelled", # MAV_RESULT_CANCELLED, no longer defined by recent pymavlink dialects
+}
+
+
+def command_status(command, result):
+    """
+    Human readable status of a command, ex : "176 : Accepted".
+    """
+    return str(command) + " : " + MAV_RESULT_STATUS.get(result, "Failed")
+
+
+class CommandFuture(Future):
+    """
+    Future of a MAV_CMD. The result is the final COMMAND_ACK message.
+    progress holds the last progress (0-100) reported by a MAV_RESULT_IN_PROGRESS ack, None if none was received.
+    """
+
+    def __init__(self, command, target_system, target_component):
+        super().__init__()
+        self.command = command
+        self.target_system = target_system
+        self.target_component = target_component
+        self.progress = None
+        self.progress_callbacks = []
+
+    def add_progress_callback(self, fn):
+        """
+        Call fn(future) every time a MAV_RESULT_IN_PROGRESS ack is received.
+        """
+        self.progress_callbacks.append(fn)
+
+    def status(self, timeout=None):
+        """
+        Wait for the ack and return its human readable status.
+        """
+        return command_status(self.command, self.result(timeout).result)
+
+
+class PendingCommand:
+
+    def __init__(self, future, send):
+        self.future = future
+        self.send = send # send(confirmation, written) queues the command, written() is called once its frame is written, written(exception) if it failed
+        self.deadline = None # Ack deadline, None until the frame is written
+        self.queued = True # A copy of the command waits to be written
+        self.confirmation = 0
+
+
+class CommandEngine:
+    """
+    Track in-flight commands, resolve them on COMMAND_ACK and retransmit them on timeout.
+    handle_ack and check_timeouts are called by the receive loop of the connection.
+    """
+
+    def __init__(self, timeout=1.5, retries=3, progress_timeout=10.0):
+        self.timeout = timeout # Seconds to wait for an ack before retransmitting
+        self.retries = retries # Retransmissions before the future fails with TimeoutError
+        self.progress_timeout = progress_timeout # Seconds to wait for the next ack after a MAV_RESULT_IN_PROGRESS
+        self.pending = {} # (command, target_system) -> list of PendingCommand, oldest first
+        self.last_futures = {} # command -> last CommandFuture submitted
+        self.lock = threading.Lock()
+
+    def submit(self, command, target_system, target_component, send):
+        """
+        Transmit a command through send(confirmation, written) and return its CommandFuture.
+        send must call written() once the frame is written, the ack timeout starts then. written(exception) fails the future with exception.
+        """
+        future = CommandFuture(command, target_system, target_component)
+        pending = PendingCommand(future, send)
+        with self.lock:
+            self.pending.setdefault((command, target_system), []).append(pending)
+            self.last_futures[command] = future
+        send(pending.confirmation, functools.partial(self.written, pending))
+        return future
+
+    def written(self, pending, exception=None):
+        with self.lock:
+            pending.queued = False
+            pending.deadline = time.monotonic() + self.timeout
+            if exception is not None:
+                key = (pending.future.command, pending.future.target_system)
+                queue = self.pending.get(key, [])
+                if pending in queue:
+                    queue.remove(pending)
+                    if not queue:
+                        del self.pending[key]
+        if exception is not None and pending.future.set_running_or_notify_cancel():
+            pending.future.set_exception(exception)
+
+    def handle_ack(self, msg):
+        """
+        Resolve the oldest in-flight command matching a COMMAND_ACK.
+        """
+        source_system = msg.get_srcSystem()
+        source_component = msg.get_srcComponent()
+        with self.lock:
+            queue = self.pending.get((msg.command, source_system))
+            if not queue:
+                return
+            for pending in queue:
+                # A command sent to component 0 (all components) is acknowledged by any of them
+                if pending.future.target_component in (0, source_component):
+                    break
+            else:
+                return
+
+            if msg.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+                pending.deadline = time.monotonic() + self.progress_timeout
+            else:
+                queue.remove(pending)
+                if not queue:
+                    del self.pending[(msg.command, source_system)]
+
+        future = pending.future
+        if msg.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+            future.progress = msg.progress
+            for fn in future.progress_callbacks:
+                fn(future)
+        elif future.set_running_or_notify_cancel():
+            future.set_result(msg)
+
+    def check_timeouts(self):
+        """
+        Retransmit the commands whose ack is late, fail the ones that ran out of retries.
+        """
+        now = time.monotonic()
+        resend = []
+        expired = []
+        with self.lock:
+            for key, queue in list(self.pending.items()):
+                for pending in list(queue):
+                    if pending.future.cancelled():
+                        queue.remove(pending)
+                    elif pending.queued:
+                        # Still waiting in the outbound queue, the timeout has not started
+                        continue
+                    elif pending.deadline <= now:
+                        if pending.confirmation < self.retries:
+                            pending.confirmation += 1
+                            pending.queued = True
+                            resend.append(pending)
+                        else:
+                            queue.remove(pending)
+                            expired.append(pending)
+                if not queue:
+                    del self.pending[key]
+
+        for pending in resend:
+            pending.send(pending.confirmation, functools.partial(self.written, pending))
+        for pending in expired:
+            if pending.future.set_running_or_notify_cancel():
+                pending.future.set_exception(TimeoutError(f"No COMMAND_ACK for command {pending.future.command} after {self.retries} retries"))
+
+    def in_flight(self):
+        with self.lock:
+            return sum(len(queue) for queue in self.pending.values())
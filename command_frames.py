@@ -0,0 +1,85 @@
+"""
+Precompiled COMMAND_LONG / COMMAND_INT frames.
+
+pymavlink builds a message object and goes through its generic encoder for every command. A CommandFrameTemplate is compiled once per
+(message, command, target_system, target_component) : the MAVLink 2 header and the constant fields are written in a reusable bytearray,
+and a send only patches the parameters, the sequence number and the CRC before writing the frame.
+MAVLink 1 and signed connections are not handled here, they keep going through pymavlink.
+"""
+
+import struct
+from mavlink_dialect import mavutil
+
+MAVLINK_STX_V2 = 0xFD
+HEADER_V2 = struct.Struct("<BBBBBBBHB") # STX, payload length, incompat flags, compat flags, seq, sysid, compid, msgid (24 bits)
+HEADER_V2_SIZE = HEADER_V2.size
+CRC = struct.Struct("<H")
+
+
+class CommandFrameTemplate:
+    """
+    Reusable frame of one command, sent through write(mav, params, extra).
+    """
+    MESSAGE = None # pymavlink message class, its native_format lists the fields in wire order
+
+    def __init__(self, mav, command, target_system, target_component):
+        self.payload = struct.Struct(self.MESSAGE.native_format.decode())
+        self.crc_extra = bytes([self.MESSAGE.crc_extra])
+        self.command = command
+        self.target_system = target_system
+        self.target_component = target_component
+        self.buffer = bytearray(HEADER_V2_SIZE + self.payload.size + CRC.size)
+        msgid = self.MESSAGE.id
+        HEADER_V2.pack_into(self.buffer, 0, MAVLINK_STX_V2, 0, 0, 0, 0, mav.srcSystem, mav.srcComponent, msgid & 0xFFFF, msgid >> 16)
+        self.view = memoryview(self.buffer)
+
+    @staticmethod
+    def supported(mav):
+        return float(mavutil.mavlink.WIRE_PROTOCOL_VERSION) == 2.0 and not mav.signing.sign_outgoing
+
+    def pack_payload(self, params, extra):
+        raise NotImplementedError
+
+    def write(self, mav, params, extra=0):
+        """
+        Patch params and the per-send fields in the frame and write it. Returns the number of bytes written.
+        """
+        self.pack_payload(params, extra)
+
+        # MAVLink 2 truncates the trailing zero bytes of the payload (keeping at least one)
+        end = HEADER_V2_SIZE + self.payload.size
+        while end > HEADER_V2_SIZE + 1 and self.buffer[end - 1] == 0:
+            end -= 1
+        self.buffer[1] = end - HEADER_V2_SIZE
+        self.buffer[4] = mav.seq
+
+        crc = mavutil.mavlink.x25crc(self.view[1:end])
+        crc.accumulate(self.crc_extra)
+        CRC.pack_into(self.buffer, end, crc.crc)
+
+        length = end + CRC.size
+        mav.file.write(self.view[:length])
+        mav.seq = (mav.seq + 1) % 256
+        mav.total_packets_sent += 1
+        mav.total_bytes_sent += length
+        return length
+
+
+class CommandLongTemplate(CommandFrameTemplate):
+    """
+    COMMAND_LONG, extra is the confirmation field.
+    """
+    MESSAGE = mavutil.mavlink.MAVLink_command_long_message
+
+    def pack_payload(self, params, extra):
+        self.payload.pack_into(self.buffer, HEADER_V2_SIZE, *params, self.command, self.target_system, self.target_component, extra)
+
+
+class CommandIntTemplate(CommandFrameTemplate):
+    """
+    COMMAND_INT, extra is the frame field. params 5 and 6 must be integers (x / y).
+    """
+    MESSAGE = mavutil.mavlink.MAVLink_command_int_message
+
+    def pack_payload(self, params, extra):
+        self.payload.pack_into(self.buffer, HEADER_V2_SIZE, *params, self.command, self.target_system, self.target_component, extra, 0, 0)
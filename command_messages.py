@@ -1,4 +1,4 @@
-from pymavlink import mavutil
+from mavlink_dialect import mavutil
 
 
 class CommandProtocol(object):
@@ -17,7 +17,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_WAYPOINT
         params = [hold, accept_radius, pass_radius, yaw, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_loiter_unlim(self, radius, yaw, latitude, longitude, altitude):
         """
@@ -31,7 +31,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_LOITER_UNLIM
         params = [0, 0, radius, yaw, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_loiter_turns(self, turns, heading_required, radius, xtrack_location, latitude, longitude, altitude):
         """
@@ -47,7 +47,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_LOITER_TURNS
         params = [turns, heading_required, radius, xtrack_location, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_loiter_time(self, time, heading_required, radius, xtrack_location, latitude, longitude, altitude):
         """
@@ -63,7 +63,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_LOITER_TIME
         params = [time, heading_required, radius, xtrack_location, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_return_to_launch(self):
         """
@@ -72,7 +72,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_land(self, abort_alt, land_mode, yaw_angle, latitude, longitude, altitude):
         """
@@ -87,7 +87,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_LAND
         params = [abort_alt, land_mode, 0, yaw_angle, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_takeoff(self, pitch, yaw, latitude, longitude, altitude):
         """
@@ -101,7 +101,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_TAKEOFF
         params = [pitch, 0, 0, yaw, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_land_local(self, target, offset, descend_rate, yaw, y_position, x_position, z_position):
         """
@@ -117,7 +117,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_LAND_LOCAL
         params = [target, offset, descend_rate, yaw, y_position, x_position, z_position]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_takeoff_local(self, pitch, ascend_rate, yaw, y_position, x_position, z_position):
         """
@@ -132,7 +132,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_TAKEOFF_LOCAL
         params = [pitch, 0, ascend_rate, yaw, y_position, x_position, z_position]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_follow(self, following, ground_speed, radius, yaw, latitude, longitude, altitude):
         """
@@ -148,7 +148,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_FOLLOW
         params = [following, ground_speed, radius, yaw, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_continue_and_change_alt(self, action, altitude):
         """
@@ -159,7 +159,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_CONTINUE_AND_CHANGE_ALT
         params = [action, 0, 0, 0, 0, 0, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_loiter_to_alt(self, heading_required, radius, xtrack_location, latitude, longitude, altitude):
         """
@@ -177,7 +177,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_LOITER_TO_ALT
         params = [heading_required, radius, 0, xtrack_location, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_follow(self, system_id, altitude_mode, altitude, time_to_land):
         """
@@ -191,7 +191,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_FOLLOW
         params = [system_id, 0, 0, altitude_mode, altitude, 0, time_to_land]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_follow_reposition(self, camera_q1, camera_q2, camera_q3, camera_q4, altitude_offset, x_offset, y_offset):
         """
@@ -207,7 +207,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_FOLLOW_REPOSITION
         params = [camera_q1, camera_q2, camera_q3, camera_q4, altitude_offset, x_offset, y_offset]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_orbit(self, radius, velocity, yaw_behavior, orbits, latitude_x, longitude_y, altitude_z):
         """
@@ -223,7 +223,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_ORBIT
         params = [radius, velocity, yaw_behavior, orbits, latitude_x, longitude_y, altitude_z]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_roi(self, roi_mode, wp_index, roi_index, x, y, z):
         """
@@ -238,7 +238,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_ROI
         params = [roi_mode, wp_index, roi_index, 0, x, y, z]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_pathplanning(self, local_ctrl, global_ctrl, yaw, latitude_x, longitude_y, altitude_z):
         """
@@ -253,7 +253,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_PATHPLANNING
         params = [local_ctrl, global_ctrl, 0, yaw, latitude_x, longitude_y, altitude_z]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_spline_waypoint(self, hold, latitude_x, longitude_y, altitude_z):
         """
@@ -266,7 +266,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_SPLINE_WAYPOINT
         params = [hold, 0, 0, 0, latitude_x, longitude_y, altitude_z]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_vtol_takeoff(self, transition_heading, yaw_angle, latitude, longitude, altitude):
         """
@@ -280,7 +280,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_VTOL_TAKEOFF
         params = [0, transition_heading, 0, yaw_angle, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_vtol_land(self, land_options, approach_altitude, yaw, latitude, longitude, ground_altitude):
         """
@@ -295,7 +295,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_VTOL_LAND
         params = [land_options, 0, approach_altitude, yaw, latitude, longitude, ground_altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_guided_enable(self, enable):
         """
@@ -305,7 +305,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_GUIDED_ENABLE
         params = [enable, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_delay(self, delay, hour, minute, second):
         """
@@ -318,7 +318,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_DELAY
         params = [delay, hour, minute, second, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_payload_place(self, max_descent, latitude, longitude, altitude):
         """
@@ -331,7 +331,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_PAYLOAD_PLACE
         params = [max_descent, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_last(self):
         """
@@ -340,7 +340,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_LAST
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_condition_delay(self, delay):
         """
@@ -350,7 +350,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CONDITION_DELAY
         params = [delay, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_condition_change_alt(self, rate, altitude):
         """
@@ -361,7 +361,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT
         params = [rate, 0, 0, 0, 0, 0, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_condition_distance(self, distance):
         """
@@ -371,7 +371,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CONDITION_DISTANCE
         params = [distance, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_condition_yaw(self, angle, angular_speed, direction, relative):
         """
@@ -384,7 +384,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CONDITION_YAW
         params = [angle, angular_speed, direction, relative, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_condition_last(self):
         """
@@ -393,7 +393,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CONDITION_LAST
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_mode(self, mode, custom_mode, custom_submode):
         """
@@ -405,7 +405,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_MODE
         params = [mode, custom_mode, custom_submode, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_jump(self, number, repeat):
         """
@@ -416,7 +416,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_JUMP
         params = [number, repeat, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_change_speed(self, speed_type, speed, throttle):
         """
@@ -428,7 +428,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_CHANGE_SPEED
         params = [speed_type, speed, throttle, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_home(self, use_current, yaw, latitude, longitude, altitude):
         """
@@ -442,7 +442,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_HOME
         params = [use_current, 0, 0, yaw, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_parameter(self, number, value):
         """
@@ -453,7 +453,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_PARAMETER
         params = [number, value, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_relay(self, instance, setting):
         """
@@ -464,7 +464,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_RELAY
         params = [instance, setting, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_repeat_relay(self, instance, count, time):
         """
@@ -476,7 +476,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_REPEAT_RELAY
         params = [instance, count, time, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_servo(self, instance, pwm):
         """
@@ -487,7 +487,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_SERVO
         params = [instance, pwm, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_repeat_servo(self, instance, pwm, count, time):
         """
@@ -500,7 +500,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_REPEAT_SERVO
         params = [instance, pwm, count, time, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_flighttermination(self, terminate):
         """
@@ -510,7 +510,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_FLIGHTTERMINATION
         params = [terminate, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_change_altitude(self, altitude, frame):
         """
@@ -521,7 +521,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_CHANGE_ALTITUDE
         params = [altitude, frame, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_actuator(self, actuator_1, actuator_2, actuator_3, actuator_4, actuator_5, actuator_6, index):
         """
@@ -537,7 +537,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_ACTUATOR
         params = [actuator_1, actuator_2, actuator_3, actuator_4, actuator_5, actuator_6, index]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_land_start(self, latitude, longitude, altitude):
         """
@@ -549,7 +549,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_LAND_START
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_rally_land(self, altitude, speed):
         """
@@ -560,7 +560,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_RALLY_LAND
         params = [altitude, speed, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_go_around(self, altitude):
         """
@@ -570,7 +570,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_GO_AROUND
         params = [altitude, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_reposition(self, speed, bitmask, radius, yaw, latitude, longitude, altitude):
         """
@@ -586,7 +586,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_REPOSITION
         params = [speed, bitmask, radius, yaw, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_pause_continue(self, keep_going):
         """
@@ -596,7 +596,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_PAUSE_CONTINUE
         params = [keep_going, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_reverse(self, reverse):
         """
@@ -606,7 +606,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_REVERSE
         params = [reverse, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_roi_location(self, gimbal_device_id, latitude, longitude, altitude):
         """
@@ -619,7 +619,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_ROI_LOCATION
         params = [gimbal_device_id, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_roi_wpnext_offset(self, gimbal_device_id, pitch_offset, roll_offset, yaw_offset):
         """
@@ -632,7 +632,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_ROI_WPNEXT_OFFSET
         params = [gimbal_device_id, 0, 0, 0, pitch_offset, roll_offset, yaw_offset]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_roi_none(self, gimbal_device_id):
         """
@@ -642,7 +642,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_ROI_NONE
         params = [gimbal_device_id, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_roi_sysid(self, system_id, gimbal_device_id):
         """
@@ -653,7 +653,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_ROI_SYSID
         params = [system_id, gimbal_device_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_control_video(self, id, transmission, interval, recording):
         """
@@ -666,7 +666,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_CONTROL_VIDEO
         params = [id, transmission, interval, recording, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_roi(self, roi_mode, wp_index, roi_index):
         """
@@ -678,7 +678,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_ROI
         params = [roi_mode, wp_index, roi_index, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_digicam_configure(self, mode, shutter_speed, aperture, iso, exposure, command_identity, engine_cut_off):
         """
@@ -694,7 +694,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_DIGICAM_CONFIGURE
         params = [mode, shutter_speed, aperture, iso, exposure, command_identity, engine_cut_off]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_digicam_control(self, session_control, zoom_absolute, zoom_relative, focus, shoot_command, command_identity, shot_id):
         """
@@ -710,7 +710,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_DIGICAM_CONTROL
         params = [session_control, zoom_absolute, zoom_relative, focus, shoot_command, command_identity, shot_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_mount_configure(self, mode, stabilize_roll, stabilize_pitch, stabilize_yaw, roll_input_mode, pitch_input_mode, yaw_input_mode):
         """
@@ -726,7 +726,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_MOUNT_CONFIGURE
         params = [mode, stabilize_roll, stabilize_pitch, stabilize_yaw, roll_input_mode, pitch_input_mode, yaw_input_mode]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_mount_control(self, pitch, roll, yaw, altitude, latitude, longitude, mode):
         """
@@ -742,7 +742,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_MOUNT_CONTROL
         params = [pitch, roll, yaw, altitude, latitude, longitude, mode]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_cam_trigg_dist(self, distance, shutter, trigger):
         """
@@ -754,7 +754,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_CAM_TRIGG_DIST
         params = [distance, shutter, trigger, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_fence_enable(self, enable):
         """
@@ -764,7 +764,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_FENCE_ENABLE
         params = [enable, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_parachute(self, action):
         """
@@ -774,7 +774,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_PARACHUTE
         params = [action, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_motor_test(self, instance, throttle_type, throttle, timeout, motor_count, test_order):
         """
@@ -789,7 +789,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_MOTOR_TEST
         params = [instance, throttle_type, throttle, timeout, motor_count, test_order, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_inverted_flight(self, inverted):
         """
@@ -799,7 +799,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_INVERTED_FLIGHT
         params = [inverted, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_gripper(self, instance, action):
         """
@@ -810,7 +810,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_GRIPPER
         params = [instance, action, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_autotune_enable(self, enable, axis):
         """
@@ -821,7 +821,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_AUTOTUNE_ENABLE
         params = [enable, axis, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_set_yaw_speed(self, yaw, speed, angle):
         """
@@ -833,7 +833,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_SET_YAW_SPEED
         params = [yaw, speed, angle, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_cam_trigg_interval(self, trigger_cycle, shutter_integration):
         """
@@ -844,7 +844,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_CAM_TRIGG_INTERVAL
         params = [trigger_cycle, shutter_integration, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_mount_control_quat(self, q1, q2, q3, q4):
         """
@@ -857,7 +857,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_MOUNT_CONTROL_QUAT
         params = [q1, q2, q3, q4, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_guided_master(self, system_id, component_id):
         """
@@ -868,7 +868,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_GUIDED_MASTER
         params = [system_id, component_id, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_guided_limits(self, timeout, min_altitude, max_altitude, horiz_move_limit):
         """
@@ -881,7 +881,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_GUIDED_LIMITS
         params = [timeout, min_altitude, max_altitude, horiz_move_limit, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_engine_control(self, start_engine, cold_start, height_delay):
         """
@@ -893,7 +893,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_ENGINE_CONTROL
         params = [start_engine, cold_start, height_delay, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_set_mission_current(self, number, reset_mission):
         """
@@ -904,7 +904,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_SET_MISSION_CURRENT
         params = [number, reset_mission, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_last(self):
         """
@@ -913,7 +913,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_LAST
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_preflight_calibration(self, gyro_temperature, magnetometer, ground_pressure, remote_control, accelerometer, compmot_or_airspeed, esc_or_baro):
         """
@@ -929,7 +929,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_PREFLIGHT_CALIBRATION
         params = [gyro_temperature, magnetometer, ground_pressure, remote_control, accelerometer, compmot_or_airspeed, esc_or_baro]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_preflight_set_sensor_offsets(self, sensor_type, x_offset, y_offset, z_offset, fourth_dimension, fifth_dimension, sixth_dimension):
         """
@@ -945,7 +945,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_PREFLIGHT_SET_SENSOR_OFFSETS
         params = [sensor_type, x_offset, y_offset, z_offset, fourth_dimension, fifth_dimension, sixth_dimension]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_preflight_uavcan(self, actuator_id):
         """
@@ -955,7 +955,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_PREFLIGHT_UAVCAN
         params = [actuator_id, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_preflight_storage(self, parameter_storage, mission_storage, logging_rate):
         """
@@ -967,7 +967,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_PREFLIGHT_STORAGE
         params = [parameter_storage, mission_storage, logging_rate, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_preflight_reboot_shutdown(self, autopilot, companion, component_action, component_id):
         """
@@ -980,7 +980,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN
         params = [autopilot, companion, component_action, component_id, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_override_goto(self, keep_going, position, frame, yaw, latitude_x, longitude_y, altitude_z):
         """
@@ -996,7 +996,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_OVERRIDE_GOTO
         params = [keep_going, position, frame, yaw, latitude_x, longitude_y, altitude_z]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_oblique_survey(self, distance, shutter, min_interval, positions, roll_angle, pitch_angle):
         """
@@ -1011,7 +1011,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_OBLIQUE_SURVEY
         params = [distance, shutter, min_interval, positions, roll_angle, pitch_angle, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_mission_start(self, first_item, last_item):
         """
@@ -1022,7 +1022,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_MISSION_START
         params = [first_item, last_item]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_actuator_test(self, value, timeout, output_function):
         """
@@ -1034,7 +1034,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_ACTUATOR_TEST
         params = [value, timeout, 0, 0, output_function, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_configure_actuator(self, configuration, output_function):
         """
@@ -1045,7 +1045,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CONFIGURE_ACTUATOR
         params = [configuration, 0, 0, 0, output_function, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_component_arm_disarm(self, arm, force):
         """
@@ -1056,7 +1056,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM
         params = [arm, force]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_run_prearm_checks(self):
         """
@@ -1065,7 +1065,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_RUN_PREARM_CHECKS
         params = []
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_illuminator_on_off(self, enable):
         """
@@ -1075,7 +1075,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_ILLUMINATOR_ON_OFF
         params = [enable]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_get_home_position(self):
         """
@@ -1084,7 +1084,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_GET_HOME_POSITION
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_inject_failure(self, failure_unit, failure_type, instance):
         """
@@ -1096,7 +1096,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_INJECT_FAILURE
         params = [failure_unit, failure_type, instance]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_start_rx_pair(self, spektrum, rc_type):
         """
@@ -1107,7 +1107,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_START_RX_PAIR
         params = [spektrum, rc_type]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_get_message_interval(self, message_id):
         """
@@ -1117,7 +1117,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_GET_MESSAGE_INTERVAL
         params = [message_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_set_message_interval(self, message_id, interval, response_target):
         """
@@ -1129,7 +1129,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL
         params = [message_id, interval, response_target]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_message(self, message_id, req_param_1, req_param_2, req_param_3, req_param_4, req_param_5, response_target):
         """
@@ -1145,7 +1145,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE
         params = [message_id, req_param_1, req_param_2, req_param_3, req_param_4, req_param_5, response_target]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_protocol_version(self, protocol):
         """
@@ -1155,7 +1155,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_PROTOCOL_VERSION
         params = [protocol, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_autopilot_capabilities(self, version):
         """
@@ -1165,7 +1165,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_AUTOPILOT_CAPABILITIES
         params = [version, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_camera_information(self, capabilities):
         """
@@ -1175,7 +1175,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_CAMERA_INFORMATION
         params = [capabilities, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_camera_settings(self, settings):
         """
@@ -1185,7 +1185,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_CAMERA_SETTINGS
         params = [settings, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_storage_information(self, storage_id, information):
         """
@@ -1196,7 +1196,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_STORAGE_INFORMATION
         params = [storage_id, information, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_storage_format(self, storage_id, format, reset_image_log):
         """
@@ -1208,7 +1208,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_STORAGE_FORMAT
         params = [storage_id, format, reset_image_log, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_camera_capture_status(self, capture_status):
         """
@@ -1218,7 +1218,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_CAMERA_CAPTURE_STATUS
         params = [capture_status, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_flight_information(self, flight_information):
         """
@@ -1228,7 +1228,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_FLIGHT_INFORMATION
         params = [flight_information, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_reset_camera_settings(self, reset):
         """
@@ -1238,7 +1238,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_RESET_CAMERA_SETTINGS
         params = [reset, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_set_camera_mode(self, camera_mode):
         """
@@ -1248,7 +1248,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SET_CAMERA_MODE
         params = [0, camera_mode, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_set_camera_zoom(self, zoom_type, zoom_value):
         """
@@ -1259,7 +1259,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SET_CAMERA_ZOOM
         params = [zoom_type, zoom_value, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_set_camera_focus(self, focus_type, focus_value):
         """
@@ -1270,7 +1270,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SET_CAMERA_FOCUS
         params = [focus_type, focus_value, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_set_storage_usage(self, storage_id, usage):
         """
@@ -1281,7 +1281,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SET_STORAGE_USAGE
         params = [storage_id, usage]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_jump_tag(self, tag):
         """
@@ -1291,7 +1291,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_JUMP_TAG
         params = [tag]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_jump_tag(self, tag, repeat):
         """
@@ -1302,7 +1302,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_JUMP_TAG
         params = [tag, repeat]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_gimbal_manager_pitchyaw(self, pitch_angle, yaw_angle, pitch_rate, yaw_rate, gimbal_manager_flags, gimbal_device_id):
         """
@@ -1317,7 +1317,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_GIMBAL_MANAGER_PITCHYAW
         params = [pitch_angle, yaw_angle, pitch_rate, yaw_rate, gimbal_manager_flags, gimbal_device_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_gimbal_manager_configure(self, sysid_primary_control, compid_primary_control, sysid_secondary_control, compid_secondary_control, gimbal_device_id):
         """
@@ -1331,7 +1331,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_GIMBAL_MANAGER_CONFIGURE
         params = [sysid_primary_control, compid_primary_control, sysid_secondary_control, compid_secondary_control, gimbal_device_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_image_start_capture(self, interval, total_images, sequence_number):
         """
@@ -1343,7 +1343,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_IMAGE_START_CAPTURE
         params = [0, interval, total_images, sequence_number, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_image_stop_capture(self):
         """
@@ -1352,7 +1352,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_IMAGE_STOP_CAPTURE
         params = [0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_camera_image_capture(self, number):
         """
@@ -1362,7 +1362,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_CAMERA_IMAGE_CAPTURE
         params = [number, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_trigger_control(self, enable, reset, pause):
         """
@@ -1374,7 +1374,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_TRIGGER_CONTROL
         params = [enable, reset, pause]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_camera_track_point(self, point_x, point_y, radius):
         """
@@ -1386,7 +1386,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CAMERA_TRACK_POINT
         params = [point_x, point_y, radius]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_camera_track_rectangle(self, top_left_corner_x, top_left_corner_y, bottom_right_corner_x, bottom_right_corner_y):
         """
@@ -1399,7 +1399,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CAMERA_TRACK_RECTANGLE
         params = [top_left_corner_x, top_left_corner_y, bottom_right_corner_x, bottom_right_corner_y]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_camera_stop_tracking(self):
         """
@@ -1408,7 +1408,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CAMERA_STOP_TRACKING
         params = []
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_video_start_capture(self, stream_id, status_frequency):
         """
@@ -1419,7 +1419,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_VIDEO_START_CAPTURE
         params = [stream_id, status_frequency, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_video_stop_capture(self, stream_id):
         """
@@ -1429,7 +1429,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_VIDEO_STOP_CAPTURE
         params = [stream_id, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_video_start_streaming(self, stream_id):
         """
@@ -1439,7 +1439,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_VIDEO_START_STREAMING
         params = [stream_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_video_stop_streaming(self, stream_id):
         """
@@ -1449,7 +1449,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_VIDEO_STOP_STREAMING
         params = [stream_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_video_stream_information(self, stream_id):
         """
@@ -1459,7 +1459,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_VIDEO_STREAM_INFORMATION
         params = [stream_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_request_video_stream_status(self, stream_id):
         """
@@ -1469,7 +1469,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_REQUEST_VIDEO_STREAM_STATUS
         params = [stream_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_logging_start(self, format):
         """
@@ -1479,7 +1479,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_LOGGING_START
         params = [format, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_logging_stop(self):
         """
@@ -1488,7 +1488,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_LOGGING_STOP
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_airframe_configuration(self, landing_gear_id, landing_gear_position):
         """
@@ -1499,7 +1499,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_AIRFRAME_CONFIGURATION
         params = [landing_gear_id, landing_gear_position, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_control_high_latency(self, enable):
         """
@@ -1509,7 +1509,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CONTROL_HIGH_LATENCY
         params = [enable, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_panorama_create(self, horizontal_angle, vertical_angle, horizontal_speed, vertical_speed):
         """
@@ -1522,7 +1522,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_PANORAMA_CREATE
         params = [horizontal_angle, vertical_angle, horizontal_speed, vertical_speed]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_vtol_transition(self, state, immediate):
         """
@@ -1533,7 +1533,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_VTOL_TRANSITION
         params = [state, immediate]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_arm_authorization_request(self, system_id):
         """
@@ -1543,7 +1543,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_ARM_AUTHORIZATION_REQUEST
         params = [system_id]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_set_guided_submode_standard(self):
         """
@@ -1552,7 +1552,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SET_GUIDED_SUBMODE_STANDARD
         params = []
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_set_guided_submode_circle(self, radius, latitude, longitude):
         """
@@ -1564,7 +1564,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SET_GUIDED_SUBMODE_CIRCLE
         params = [radius, 0, 0, 0, latitude, longitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_condition_gate(self, geometry, usealtitude, latitude, longitude, altitude):
         """
@@ -1578,7 +1578,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CONDITION_GATE
         params = [geometry, usealtitude, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_fence_return_point(self, latitude, longitude, altitude):
         """
@@ -1590,7 +1590,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_FENCE_RETURN_POINT
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_fence_polygon_vertex_inclusion(self, vertex_count, inclusion_group, latitude, longitude):
         """
@@ -1603,7 +1603,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_FENCE_POLYGON_VERTEX_INCLUSION
         params = [vertex_count, inclusion_group, 0, 0, latitude, longitude, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_fence_polygon_vertex_exclusion(self, vertex_count, latitude, longitude):
         """
@@ -1615,7 +1615,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_FENCE_POLYGON_VERTEX_EXCLUSION
         params = [vertex_count, 0, 0, 0, latitude, longitude, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_fence_circle_inclusion(self, radius, inclusion_group, latitude, longitude):
         """
@@ -1628,7 +1628,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_FENCE_CIRCLE_INCLUSION
         params = [radius, inclusion_group, 0, 0, latitude, longitude, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_fence_circle_exclusion(self, radius, latitude, longitude):
         """
@@ -1640,7 +1640,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_FENCE_CIRCLE_EXCLUSION
         params = [radius, 0, 0, 0, latitude, longitude, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_nav_rally_point(self, latitude, longitude, altitude):
         """
@@ -1652,7 +1652,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_NAV_RALLY_POINT
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_uavcan_get_node_info(self):
         """
@@ -1661,7 +1661,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_UAVCAN_GET_NODE_INFO
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_adsb_out_ident(self):
         """
@@ -1670,7 +1670,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_ADSB_OUT_IDENT
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_payload_prepare_deploy(self, operation_mode, approach_vector, ground_speed, altitude_clearance, latitude, longitude, altitude):
         """
@@ -1686,7 +1686,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_PAYLOAD_PREPARE_DEPLOY
         params = [operation_mode, approach_vector, ground_speed, altitude_clearance, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_payload_control_deploy(self, operation_mode):
         """
@@ -1696,7 +1696,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_PAYLOAD_CONTROL_DEPLOY
         params = [operation_mode, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_fixed_mag_cal_yaw(self, yaw, compassmask, latitude, longitude):
         """
@@ -1709,7 +1709,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_FIXED_MAG_CAL_YAW
         params = [yaw, compassmask, latitude, longitude, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_do_winch(self, instance, action, length, rate):
         """
@@ -1722,7 +1722,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_DO_WINCH
         params = [instance, action, length, rate, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_waypoint_user_1(self, latitude, longitude, altitude):
         """
@@ -1734,7 +1734,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_WAYPOINT_USER_1
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_waypoint_user_2(self, latitude, longitude, altitude):
         """
@@ -1746,7 +1746,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_WAYPOINT_USER_2
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_waypoint_user_3(self, latitude, longitude, altitude):
         """
@@ -1758,7 +1758,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_WAYPOINT_USER_3
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_waypoint_user_4(self, latitude, longitude, altitude):
         """
@@ -1770,7 +1770,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_WAYPOINT_USER_4
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_waypoint_user_5(self, latitude, longitude, altitude):
         """
@@ -1782,7 +1782,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_WAYPOINT_USER_5
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_spatial_user_1(self, latitude, longitude, altitude):
         """
@@ -1794,7 +1794,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SPATIAL_USER_1
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_spatial_user_2(self, latitude, longitude, altitude):
         """
@@ -1806,7 +1806,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SPATIAL_USER_2
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_spatial_user_3(self, latitude, longitude, altitude):
         """
@@ -1818,7 +1818,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SPATIAL_USER_3
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_spatial_user_4(self, latitude, longitude, altitude):
         """
@@ -1830,7 +1830,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SPATIAL_USER_4
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_spatial_user_5(self, latitude, longitude, altitude):
         """
@@ -1842,7 +1842,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_SPATIAL_USER_5
         params = [0, 0, 0, 0, latitude, longitude, altitude]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_user_1(self):
         """
@@ -1851,7 +1851,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_USER_1
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_user_2(self):
         """
@@ -1860,7 +1860,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_USER_2
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_user_3(self):
         """
@@ -1869,7 +1869,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_USER_3
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_user_4(self):
         """
@@ -1878,7 +1878,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_USER_4
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_user_5(self):
         """
@@ -1887,7 +1887,7 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_USER_5
         params = [0, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
     def mav_cmd_can_forward(self, bus):
         """
@@ -1897,5 +1897,5 @@ class CommandProtocol(object):
         command = mavutil.mavlink.MAV_CMD_CAN_FORWARD
         params = [bus, 0, 0, 0, 0, 0, 0]
 
-        self.send_mavlink_command(command, params)
+        return self.send_mavlink_command(command, params)
 
@@ -1,38 +1,241 @@
-from pymavlink import mavutil
-from dronekit import VehicleMode
-from command_messages import MavCmd
+import functools
+import threading
+import time
+from mavlink_dialect import mavutil
+from command_messages import CommandProtocol
+from command_engine import CommandEngine, command_status
+from command_frames import CommandFrameTemplate, CommandIntTemplate, CommandLongTemplate
+from command_routing import POSITIONAL_COMMANDS, command_int_params
+from dispatcher import ALL_MESSAGES, MessageDispatcher
+from frame_receiver import FrameReceiver
+from latency import LatencyTracker
+from mission import MissionTransfer
+from outbound import BULK, COMMAND, CONTROL, SAFETY, OutboundScheduler
+from parameters import ParameterSync
+from shaper import LinkShaper
+from stream_manager import StreamManager
+from telemetry import TelemetryCache
 
-class Protocol():
+# Outbound priority of the commands that are not regular commands, see outbound
+COMMAND_PRIORITIES = {
+    mavutil.mavlink.MAV_CMD_DO_FLIGHTTERMINATION: SAFETY,
+    mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH: SAFETY,
+    mavutil.mavlink.MAV_CMD_NAV_LAND: SAFETY,
+    mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM: SAFETY,
+    mavutil.mavlink.MAV_CMD_DO_SET_PARAMETER: BULK,
+    mavutil.mavlink.MAV_CMD_PREFLIGHT_STORAGE: BULK,
+}
+
+# Acks after which a mode change may still show up in the HEARTBEAT
+MODE_ACK_PENDING = (mavutil.mavlink.MAV_RESULT_ACCEPTED, mavutil.mavlink.MAV_RESULT_IN_PROGRESS)
+
+@functools.lru_cache(maxsize=None)
+def mode_mapping(autopilot, mav_type):
+    """
+    Mode table of an autopilot / vehicle type : {mode name: (DO_SET_MODE custom mode, DO_SET_MODE custom sub mode, HEARTBEAT custom_mode)}.
+    """
+    if autopilot == mavutil.mavlink.MAV_AUTOPILOT_PX4:
+        return {name: (main_mode, sub_mode, (main_mode << 16) | (sub_mode << 24)) for name, (base_mode, main_mode, sub_mode) in mavutil.px4_map.items()}
+
+    # ArduPilot : copter, plane, rover, sub... depending on the vehicle type
+    modes = mavutil.mode_mapping_byname(mav_type) or {}
+    return {name: (number, 0, number) for name, number in modes.items()}
+
+class Protocol(CommandProtocol):
     TARGET_SYSTEM = 1 # The system ID of the target MAVLink system. (1 for the autopilot) Component which should execute the command, 0 for all components
     TARGET_COMPONENT = 1 # The component ID of the target component on the target system. (mavutil.mavlink.MAV_COMP_ID_AUTOPILOT1 for the autopilot), 0 for all components
 
     def __init__(self, port, baud):
-        self.vehicle = mavutil.mavlink_connection(port, baud)
-        
-    def send_mavlink_command(self, command, params, frame):
+        self.attach(mavutil.mavlink_connection(port, baud))
+
+    def attach(self, vehicle, outbound=None):
+        """
+        Initialize the per-vehicle state on an open connection. Vehicles sharing a connection must share its OutboundScheduler.
+        """
+        self.vehicle = vehicle
+        self.outbound = outbound if outbound is not None else OutboundScheduler()
+        self.latency = LatencyTracker()
+        self.dispatcher = MessageDispatcher()
+        self.command_engine = CommandEngine()
+        self.dispatcher.subscribe('COMMAND_ACK', self.command_engine.handle_ack)
+        self.telemetry = TelemetryCache()
+        self.telemetry_subscriptions = []
+        self.track_telemetry()
+        self.streams = StreamManager(self) # Inactive until self.streams.start()
+        self.missions = MissionTransfer(self) # Mission upload / download, see mission
+        self.parameters = ParameterSync(self) # Parameter download / bulk set, see parameters
+        self.command_templates = {} # (template class, command, target_system, target_component) -> CommandFrameTemplate
+        self.receiving = threading.Event()
+        self.receiver = None
+
+    def start(self, zero_copy=False):
+        """
+        Start the receive loop, the only reader of the connection. Incoming messages are delivered to the subscribers of self.dispatcher.
+        With zero_copy, messages without subscriber are skipped from their header and the others are decoded lazily (see frame_receiver).
+        By default the telemetry cache only keeps the messages decoded for the other subscribers, see track_telemetry.
+        """
+        if self.receiver is None:
+            self.receiving.set()
+            loop = self.receive_loop_zero_copy if zero_copy else self.receive_loop
+            self.receiver = threading.Thread(target=loop, name="mavlink-receive", daemon=True)
+            self.receiver.start()
+
+    def stop(self):
+        self.receiving.clear()
+        if self.receiver is not None:
+            self.receiver.join()
+            self.receiver = None
+
+    def receive_loop(self):
+        while self.receiving.is_set():
+            msg = self.vehicle.recv_match(blocking=True, timeout=0.1)
+            if msg is not None and msg.get_type() != 'BAD_DATA':
+                self.dispatcher.dispatch(msg)
+            self.command_engine.check_timeouts()
+
+    def receive_loop_zero_copy(self):
+        self.frame_receiver = FrameReceiver(self.vehicle)
+        while self.receiving.is_set():
+            try:
+                messages = self.frame_receiver.frames(self.dispatcher.wanted_ids)
+            except (ConnectionError, OSError) as e:
+                # Connection lost for good (no autoreconnect, or reconnection failed)
+                print(f"Receive loop stopped : {e}")
+                self.receiving.clear()
+                self.receiver = None
+                return
+            for msg in messages:
+                self.dispatcher.dispatch(msg)
+            self.command_engine.check_timeouts()
+
+    def track_telemetry(self, msg_types=None):
+        """
+        Choose the message types kept in self.telemetry. By default every message received is kept, with a passive subscription : in
+        zero-copy mode the types nobody else subscribed to are still skipped from their header.
+        """
+        for subscription in self.telemetry_subscriptions:
+            self.dispatcher.unsubscribe(subscription)
+        if msg_types is None:
+            self.telemetry_subscriptions = [self.dispatcher.subscribe(ALL_MESSAGES, self.telemetry.update, name="telemetry", passive=True)]
+        else:
+            self.telemetry_subscriptions = [
+                self.dispatcher.subscribe(msg_type, self.telemetry.update, name="telemetry") for msg_type in msg_types
+            ]
+
+    def enable_shaping(self, shaper=None):
+        """
+        Rate limit the outbound link with a LinkShaper adapted from the RADIO_STATUS of the radio (see shaper). Returns the shaper.
+        """
+        shaper = shaper if shaper is not None else LinkShaper()
+        self.outbound.shaper = shaper
+        self.subscribe('RADIO_STATUS', shaper.handle_radio_status, name="shaper")
+        return shaper
+
+    def subscribe(self, msg_type, callback=None, maxsize=100, name=None, rate_hz=None):
+        """
+        Subscribe to incoming messages of a type, see MessageDispatcher.subscribe. Starts the receive loop.
+        """
+        subscription = self.dispatcher.subscribe(msg_type, callback, maxsize, name, rate_hz)
+        self.start()
+        return subscription
+
+    def wait_message(self, msg_type, timeout=None):
+        """
+        Wait for the next message of a type without taking it from the other consumers. Returns None on timeout.
+        """
+        subscription = self.subscribe(msg_type, maxsize=1, name=f"wait_message {msg_type}")
+        try:
+            return subscription.get(timeout)
+        finally:
+            self.dispatcher.unsubscribe(subscription)
+
+    def send_mavlink_command(self, command, params, frame=mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT):
         """
         MAV_CMD : Send a command with up to seven parameters to the MAV. 
+        Returns a CommandFuture resolved with the COMMAND_ACK. The command is retransmitted with an incremented confirmation until it is acknowledged.
         """
-        if isinstance(params[5], float) and isinstance(params[6], float):
-            # COMMAND_LONG is required for commands that mandate float values in params 5 and 6. The command microservice is documented at https://mavlink.io/en/services/command.html
-            self.vehicle.mav.command_long_send(
-                self.TARGET_SYSTEM, 
-                self.TARGET_COMPONENT, 
-                command, # Command ID (of command to send). ex : mavutil.mavlink.MAV_CMD_NAV_WAYPOINT 
-                0,  # Confirmation - 0: First transmission of this command. 1-255: Confirmation transmissions (e.g. for kill command)
-                params 
-            )
+        if len(params) < 7:
+            # Generated methods only list the params defined for their command
+            params = list(params) + [0] * (7 - len(params))
+
+        def send(confirmation, written):
+            self.send_command_frame(command, params, frame, confirmation, written)
+
+        self.start()
+        return self.command_engine.submit(command, self.TARGET_SYSTEM, self.TARGET_COMPONENT, send)
+
+    def send_message(self, msg, priority=COMMAND):
+        """
+        Queue a pymavlink message on the outbound scheduler, it is encoded and written by the writer thread.
+        """
+        def send():
+            self.vehicle.mav.send(msg)
+            return len(msg.get_msgbuf())
+
+        self.outbound.submit(priority, send)
+
+    def send_command_frame(self, command, params, frame, confirmation=0, written=None):
+        """
+        Queue a single COMMAND_LONG or COMMAND_INT frame, without waiting for its acknowledgement.
+        Commands carrying a position (see command_routing) are sent as COMMAND_INT with int32 latitude / longitude, the others as COMMAND_LONG.
+        The frame is written by the outbound scheduler with the priority of the command in COMMAND_PRIORITIES, then written() is called,
+        or written(exception) if the frame could not be written.
+        """
+        def send():
+            try:
+                length = self.write_command_frame(command, params, frame, confirmation)
+            except Exception as e:
+                if written is not None:
+                    written(e)
+                raise
+            if written is not None:
+                written()
+            return length
+
+        self.outbound.submit(COMMAND_PRIORITIES.get(command, COMMAND), send)
+
+    def write_command_frame(self, command, params, frame, confirmation):
+        """
+        Write a COMMAND_LONG or COMMAND_INT frame, from the writer thread. Returns its length in bytes.
+        """
+        if command in POSITIONAL_COMMANDS:
+            params = command_int_params(params, frame)
+            if CommandFrameTemplate.supported(self.vehicle.mav):
+                return self.command_template(CommandIntTemplate, command).write(self.vehicle.mav, params, frame)
+            else:
+                # COMMAND_INT is preferred when params 5 and 6 contain latitude/longitude data, as sending these in floats can result in a significant loss of precision. 
+                msg = self.vehicle.mav.command_int_encode(
+                    self.TARGET_SYSTEM, 
+                    self.TARGET_COMPONENT,
+                    frame, # The coordinate system of the COMMAND. https://mavlink.io/en/messages/common.html#MAV_FRAME
+                    command, # Command ID (of command to send). ex : mavutil.mavlink.MAV_CMD_NAV_WAYPOINT 
+                    0, # current
+                    0, # autocontinue
+                    *params 
+                )
+        elif CommandFrameTemplate.supported(self.vehicle.mav):
+            return self.command_template(CommandLongTemplate, command).write(self.vehicle.mav, params, confirmation)
         else:
-            # COMMAND_INT is generally preferred when sending MAV_CMD commands where param 5 and param 6 contain latitude/longitude data, as sending these in floats can result in a significant loss of precision. 
-            self.vehicle.mav.command_int_send(
+            # The command microservice is documented at https://mavlink.io/en/services/command.html
+            msg = self.vehicle.mav.command_long_encode(
                 self.TARGET_SYSTEM, 
-                self.TARGET_COMPONENT,
-                frame, # The coordinate system of the COMMAND. https://mavlink.io/en/messages/common.html#MAV_FRAME
+                self.TARGET_COMPONENT, 
                 command, # Command ID (of command to send). ex : mavutil.mavlink.MAV_CMD_NAV_WAYPOINT 
-                0, # current
-                0, # autocontinue
-                params 
+                confirmation,  # Confirmation - 0: First transmission of this command. 1-255: Confirmation transmissions (e.g. for kill command)
+                *params 
             )
+        self.vehicle.mav.send(msg)
+        return len(msg.get_msgbuf())
+
+    def command_template(self, template_class, command):
+        """
+        Precompiled frame of a command for the current target, compiled on first use.
+        """
+        key = (template_class, command, self.TARGET_SYSTEM, self.TARGET_COMPONENT)
+        template = self.command_templates.get(key)
+        if template is None:
+            template = self.command_templates[key] = template_class(self.vehicle.mav, command, self.TARGET_SYSTEM, self.TARGET_COMPONENT)
+        return template
 
     def cancel_mavlink_command(self, command):
         """
@@ -41,39 +244,31 @@ class Protocol():
         If it has already completed, the cancel action can be ignored. The cancel action can be retried until some sort of acknowledgement to the original command has been received. 
         The command microservice is documented at https://mavlink.io/en/services/command.html
         """
-        self.vehicle.mav.command_cancel_send(
+        self.send_message(self.vehicle.mav.command_cancel_encode(
             self.TARGET_SYSTEM, 
             self.TARGET_COMPONENT,  
             command, # Command ID (of command to cancel). ex : mavutil.mavlink.MAV_CMD_NAV_WAYPOINT 
-        )
+        ))
 
-    def acknowledge_mavlink_command(self, command):
+    def acknowledge_mavlink_command(self, command, timeout=None):
         """
         MAV_RESULT : Command acknowledgement. 
         Includes result (success, failure, still in progress) and may include progress information and additional detail about failure reasons.
+        Waits for the acknowledgement of the last submission of command, returns None if it was never sent.
         """
-        ack_msg = self.recv_match(type='COMMAND_ACK', blocking=True)
-        if ack_msg.command == command:
-            if ack_msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED: 
-                command_status = str(command) + ' : Accepted'
-            elif ack_msg.result == mavutil.mavlink.MAV_RESULT_TEMPORARILY_REJECTED:
-                command_status = str(command) + ' : Temporarily rejected.'
-            elif ack_msg.result == mavutil.mavlink.MAV_RESULT_DENIED:
-                command_status = str(command) + ' : Denied'
-            elif ack_msg.result == mavutil.mavlink.MAV_RESULT_UNSUPPORTED:
-                command_status = str(command) + ' : Unsupported'
-            elif ack_msg.result == mavutil.mavlink.MAV_RESULT_FAILED:
-                command_status = str(command) + ' : Failed'
-            elif ack_msg.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
-                command_status = str(command) + ' : In progress'
-            elif ack_msg.result == mavutil.mavlink.	MAV_RESULT_CANCELLED:
-                command_status = str(command) + ' : Cancelled'
-            else:
-                command_status = str(command) + ' : Failed'
-
-            return command_status            
+        future = self.command_engine.last_futures.get(command)
+        if future is None:
+            return None
+        try:
+            ack_msg = future.result(timeout)
+        except TimeoutError:
+            return command_status(command, mavutil.mavlink.MAV_RESULT_FAILED)
+        return command_status(command, ack_msg.result)
 
-    def manual_command(self, pitch, roll, thrust, yaw, button_1, button_2):
+    def manual_command(self, pitch, roll, thrust, yaw, button_1, button_2, origin=None):
+        """
+        MANUAL_CONTROL : Send the stick and button state. origin is the LatencyTracker timestamp of the input, if it is measured.
+        """
 
         msg = self.vehicle.mav.manual_control_encode(
             self.TARGET_SYSTEM, 
@@ -84,53 +279,50 @@ class Protocol():
             button_1, # A bitfield corresponding to the joystick buttons' 0-15 current state, 1 for pressed, 0 for released. The lowest bit corresponds to Button 1.
             button_2, # A bitfield corresponding to the joystick buttons' 16-31 current state, 1 for pressed, 0 for released. The lowest bit corresponds to Button 16.
         )
+        self.latency.mark("encode", origin)
 
-        self.mav.send(msg)
+        def send():
+            self.vehicle.mav.send(msg)
+            self.latency.mark("write", origin)
+            return len(msg.get_msgbuf())
 
-    def set_mode(self, mode):
+        self.outbound.submit(CONTROL, send)
+
+    def is_vehicle_heartbeat(self, msg):
+        return msg is not None and msg.get_srcSystem() == self.TARGET_SYSTEM and self.TARGET_COMPONENT in (0, msg.get_srcComponent())
+
+    def set_mode(self, mode, timeout=1.5, retries=3):
         """
-        Set mode to auto, guided or manual.
+        Switch to a flight mode by name with MAV_CMD_DO_SET_MODE, ex : "MANUAL", "GUIDED", "AUTO", "RTL" (ArduPilot) or "POSCTL", "MISSION" (PX4).
+        The mode table is taken from the autopilot and vehicle type reported in the HEARTBEAT.
+        Returns True as soon as the HEARTBEAT reports the new mode, False if the command is denied or the mode did not change after retries attempts of timeout seconds.
         """
-        if mode == "MANUAL":
-            try:
-                custom_mode = 0
-                base_mode = mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED
-
-                # Send the command
-                self.vehicle.mav.command_long_send(
-                    self.TARGET_SYSTEM,  # target_system
-                    mavutil.mavlink.MAV_COMP_ID_SYSTEM_CONTROL,  # target_component
-                    mavutil.mavlink.MAV_CMD_DO_SET_MODE,  # command
-                    0,  # confirmation
-                    base_mode,  # param1
-                    custom_mode,  # param2
-                    0,  # param3
-                    0,  # param4
-                    0,  # param5
-                    0,  # param6
-                    0  # param7
-                )
-            except:
-                self.vehicle.mode = VehicleMode('MANUAL')
+        heartbeats = self.subscribe('HEARTBEAT', maxsize=10, name="set_mode")
+        try:
+            heartbeat = self.telemetry.get('HEARTBEAT', max_age=timeout)
+            deadline = time.monotonic() + timeout
+            while not self.is_vehicle_heartbeat(heartbeat) and time.monotonic() < deadline:
+                heartbeat = heartbeats.get(max(0, deadline - time.monotonic()))
+            if not self.is_vehicle_heartbeat(heartbeat):
+                return False
 
-        elif mode == "AUTO":
-            try:
-                # Set the mode to auto
-                self.vehicle.mav.set_mode_send(
-                    self.TARGET_SYSTEM, # target system
-                    mavutil.mavlink.MAV_MODE_AUTO_GUIDED)  # base mode
-            except:
-                self.vehicle.mode = VehicleMode("AUTO")
-
-        elif mode == "GUIDED":
-            try:
-                # Set the mode to auto
-                self.vehicle.mav.command_long_send(
-                    self.TARGET_SYSTEM,
-                    self.TARGET_COMPONENT,
-                    mavutil.mavlink.MAV_CMD_NAV_GUIDED_ENABLE,  # command
-                    0,                          # confirmation
-                    1,                          # param 1, set to 1 to enable guided mode
-                    0, 0, 0, 0, 0, 0)          # param 2 - 7 not used
-            except:
-                self.vehicle.mode = VehicleMode("GUIDED")
\ No newline at end of file
+            modes = mode_mapping(heartbeat.autopilot, heartbeat.type)
+            if mode not in modes:
+                raise ValueError(f"Unknown mode {mode}, available modes : {', '.join(modes)}")
+            custom_mode, custom_submode, heartbeat_mode = modes[mode]
+            if heartbeat.custom_mode == heartbeat_mode:
+                return True
+
+            for attempt in range(retries):
+                ack = self.mav_cmd_do_set_mode(mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED, custom_mode, custom_submode)
+                deadline = time.monotonic() + timeout
+                while time.monotonic() < deadline:
+                    msg = heartbeats.get(max(0, min(deadline - time.monotonic(), 0.1)))
+                    if self.is_vehicle_heartbeat(msg) and msg.custom_mode == heartbeat_mode:
+                        return True
+                    if ack.done() and not ack.cancelled() and ack.exception() is None and ack.result().result not in MODE_ACK_PENDING:
+                        return False
+                ack.cancel()
+            return False
+        finally:
+            self.dispatcher.unsubscribe(heartbeats)
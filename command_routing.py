@@ -0,0 +1,44 @@
+"""
+COMMAND_INT vs COMMAND_LONG routing, precomputed from the MAV_CMD definitions of the loaded dialect.
+
+Commands flagged hasLocation carry a position in params 5-7 : they are sent as COMMAND_INT with latitude / longitude scaled to int32
+(degE7, or 1e-4 m in local frames) so no precision is lost in float32. Every other command is sent as COMMAND_LONG.
+See https://mavlink.io/en/services/command.html#command_int
+"""
+
+import math
+from mavlink_dialect import mavutil
+
+POSITIONAL_COMMANDS = frozenset(
+    command for command, entry in mavutil.mavlink.enums['MAV_CMD'].items() if getattr(entry, 'has_location', False)
+)
+
+# Frames in which x / y are metres (scaled by 1e4) instead of degrees (scaled by 1e7)
+LOCAL_FRAMES = frozenset(
+    getattr(mavutil.mavlink, name) for name in (
+        'MAV_FRAME_LOCAL_NED', 'MAV_FRAME_LOCAL_ENU', 'MAV_FRAME_LOCAL_OFFSET_NED', 'MAV_FRAME_BODY_NED',
+        'MAV_FRAME_BODY_OFFSET_NED', 'MAV_FRAME_BODY_FRD', 'MAV_FRAME_LOCAL_FRD', 'MAV_FRAME_LOCAL_FLU',
+    ) if hasattr(mavutil.mavlink, name)
+)
+
+INT32_MAX = 2**31 - 1 # x / y value meaning "not used" (ex : NaN latitude to keep the current position)
+
+
+def is_positional(command):
+    return command in POSITIONAL_COMMANDS
+
+
+def scale_coordinate(value, frame):
+    """
+    Scale a latitude / longitude (or local x / y in metres) to the int32 used by COMMAND_INT and MISSION_ITEM_INT.
+    """
+    if value is None or math.isnan(value):
+        return INT32_MAX
+    return int(round(value * (1e4 if frame in LOCAL_FRAMES else 1e7)))
+
+
+def command_int_params(params, frame):
+    """
+    COMMAND_INT parameters of a positional command : params 5 and 6 scaled to int32, param 7 (altitude) kept as a float.
+    """
+    return (params[0], params[1], params[2], params[3], scale_coordinate(params[4], frame), scale_coordinate(params[5], frame), params[6])
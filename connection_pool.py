@@ -0,0 +1,164 @@
+"""
+Shared connection for a fleet of vehicles.
+
+One ConnectionPool owns a single MAVLink endpoint (UDP / TCP / serial) and a single receive thread. Incoming messages are routed by
+source system / component to VehicleHandles, which have the API of Protocol (and CommandProtocol) with their own TARGET_SYSTEM and
+send through the shared transport. Threads and file descriptors stay constant whatever the number of vehicles.
+"""
+
+import threading
+from concurrent.futures import wait
+from mavlink_dialect import mavutil
+from command_protocol import Protocol
+from outbound import OutboundScheduler
+from shaper import LinkShaper
+
+# HEARTBEAT types of the components that are not vehicles : ground stations, payloads and other peripherals
+NON_VEHICLE_TYPES = frozenset(
+    getattr(mavutil.mavlink, name) for name in (
+        'MAV_TYPE_GCS', 'MAV_TYPE_ANTENNA_TRACKER', 'MAV_TYPE_GIMBAL', 'MAV_TYPE_CAMERA', 'MAV_TYPE_ADSB', 'MAV_TYPE_FLARM',
+        'MAV_TYPE_CHARGING_STATION', 'MAV_TYPE_SERVO', 'MAV_TYPE_ODID', 'MAV_TYPE_ONBOARD_CONTROLLER', 'MAV_TYPE_BATTERY',
+        'MAV_TYPE_PARACHUTE', 'MAV_TYPE_LOG', 'MAV_TYPE_OSD', 'MAV_TYPE_IMU', 'MAV_TYPE_GPS', 'MAV_TYPE_WINCH', 'MAV_TYPE_GENERIC',
+    ) if hasattr(mavutil.mavlink, name)
+)
+
+
+def is_autopilot(heartbeat):
+    """
+    Whether a HEARTBEAT comes from the autopilot of a vehicle, not from a GCS, a camera, a gimbal or a companion computer.
+    """
+    return heartbeat.autopilot != mavutil.mavlink.MAV_AUTOPILOT_INVALID and heartbeat.type not in NON_VEHICLE_TYPES
+
+
+class VehicleHandle(Protocol):
+    """
+    Protocol of one vehicle of a ConnectionPool.
+    """
+
+    def __init__(self, pool, target_system, target_component=1):
+        self.pool = pool
+        self.TARGET_SYSTEM = target_system
+        self.TARGET_COMPONENT = target_component
+        self.attach(pool.vehicle, pool.outbound)
+
+    def start(self, zero_copy=False):
+        # The pool reads the shared connection for every handle, through pymavlink
+        if zero_copy:
+            raise ValueError("Zero-copy receive is not supported on a ConnectionPool")
+        self.pool.start()
+
+    def stop(self):
+        pass
+
+
+class ConnectionPool:
+
+    def __init__(self, port, baud=57600, source_system=255):
+        self.vehicle = mavutil.mavlink_connection(port, baud, source_system=source_system)
+        self.outbound = OutboundScheduler() # Single writer shared by every handle
+        self.handles = {} # (system, component) -> VehicleHandle
+        self.systems = {} # system -> tuple of its VehicleHandles, replaced (never mutated) so the receive loop reads it without locking
+        self.heartbeats = {} # (system, component) -> last HEARTBEAT, every component heard on the link
+        self.unrouted = 0 # Messages received from systems without handle
+        self.lock = threading.Lock()
+        self.receiving = threading.Event()
+        self.receiver = None
+
+    def handle(self, target_system, target_component=1):
+        """
+        VehicleHandle of a vehicle, created on first use.
+        """
+        with self.lock:
+            handle = self.handles.get((target_system, target_component))
+            if handle is None:
+                handle = VehicleHandle(self, target_system, target_component)
+                self.handles[(target_system, target_component)] = handle
+                self.systems[target_system] = self.systems.get(target_system, ()) + (handle,)
+        return handle
+
+    def vehicles(self):
+        """
+        (system, component) of every autopilot that sent a HEARTBEAT.
+        """
+        return [target for target, heartbeat in list(self.heartbeats.items()) if is_autopilot(heartbeat)]
+
+    def start(self):
+        with self.lock:
+            if self.receiver is None:
+                self.receiving.set()
+                self.receiver = threading.Thread(target=self.receive_loop, name="mavlink-pool-receive", daemon=True)
+                self.receiver.start()
+
+    def stop(self):
+        self.receiving.clear()
+        if self.receiver is not None:
+            self.receiver.join()
+            self.receiver = None
+
+    def enable_shaping(self, shaper=None):
+        """
+        Rate limit the shared link with a LinkShaper, fed by the RADIO_STATUS of the radio whatever its system id.
+        """
+        self.outbound.shaper = shaper if shaper is not None else LinkShaper()
+        self.start()
+        return self.outbound.shaper
+
+    def route(self, msg):
+        system = msg.get_srcSystem()
+        component = msg.get_srcComponent()
+        msg_type = msg.get_type()
+        if msg_type == 'HEARTBEAT':
+            self.heartbeats[(system, component)] = msg
+        elif msg_type == 'RADIO_STATUS' and self.outbound.shaper is not None:
+            # Radios report with their own system id (51 for SiK), not the one of a vehicle
+            self.outbound.shaper.handle_radio_status(msg)
+
+        handle = self.handles.get((system, component))
+        if handle is not None:
+            handle.dispatcher.dispatch(msg)
+            return
+
+        # Other components of a vehicle (camera, gimbal...) go to every handle of its system
+        handles = self.systems.get(system)
+        if handles:
+            for handle in handles:
+                handle.dispatcher.dispatch(msg)
+        else:
+            self.unrouted += 1
+
+    def receive_loop(self):
+        while self.receiving.is_set():
+            msg = self.vehicle.recv_match(blocking=True, timeout=0.1)
+            if msg is not None and msg.get_type() != 'BAD_DATA':
+                self.route(msg)
+            for handle in list(self.handles.values()):
+                handle.command_engine.check_timeouts()
+
+    def broadcast(self, method, *args, targets=None, timeout=3.0, **kwargs):
+        """
+        Send the same command to several vehicles in one pass and collect their acknowledgements concurrently, against a single deadline.
+        method is the name of a CommandProtocol method (ex : "mav_cmd_nav_return_to_launch"), called with args / kwargs on every handle.
+        targets is a list of (system, component), every autopilot that sent a HEARTBEAT by default (see vehicles).
+        Returns {(system, component): "accepted" | "denied" | "timed out" | "failed"}.
+        """
+        if targets is None:
+            targets = self.vehicles()
+        handles = [self.handle(system, component) for system, component in targets]
+
+        futures = {}
+        for handle in handles:
+            futures[getattr(handle, method)(*args, **kwargs)] = (handle.TARGET_SYSTEM, handle.TARGET_COMPONENT)
+        wait(futures, timeout)
+
+        results = {}
+        for future, target in futures.items():
+            if not future.done():
+                future.cancel()
+                results[target] = "timed out"
+            elif future.exception() is not None:
+                results[target] = "timed out" if isinstance(future.exception(), TimeoutError) else "failed"
+            elif future.result().result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
+                results[target] = "accepted"
+            else:
+                results[target] = "denied"
+        return results
@@ -15,86 +15,281 @@ When pressed :
 Right trigger to take pictures or start/stop video. Camera mode in settings. 
 """
 
-import pygame
+import threading
+import time
 from command_protocol import Protocol
 
+class AxisTransform:
+    """
+    Precompiled stick transform : deadzone, expo curve, inversion and scaling to the MANUAL_CONTROL integer range, in a single table lookup.
+    """
+    RESOLUTION = 1000 # Table entries per unit of input, the [-1,1] input range uses 2 * RESOLUTION + 1 entries
+
+    def __init__(self, deadzone=0.05, expo=0.3, invert=False, scale=1000):
+        self.deadzone = deadzone
+        self.expo = expo
+        self.invert = invert
+        self.scale = scale
+        self.last_index = 2 * self.RESOLUTION
+        self.table = [self.compute(i / self.RESOLUTION - 1.0) for i in range(self.last_index + 1)]
+
+    def compute(self, value):
+        """
+        Reference transform used to build the table.
+        """
+        magnitude = abs(value)
+        if magnitude <= self.deadzone:
+            return 0
+        # Rescale what is left after the deadzone to [0,1] so the output still reaches full scale
+        magnitude = min((magnitude - self.deadzone) / (1.0 - self.deadzone), 1.0)
+        magnitude = (1.0 - self.expo) * magnitude + self.expo * magnitude ** 3
+        if (value < 0) != self.invert:
+            magnitude = -magnitude
+        return int(round(magnitude * self.scale))
+
+    def __call__(self, value):
+        index = int((value + 1.0) * self.RESOLUTION + 0.5)
+        if index < 0:
+            index = 0
+        elif index > self.last_index:
+            index = self.last_index
+        return self.table[index]
+
+class ManualControlScheduler:
+    """
+    Send MANUAL_CONTROL at a fixed rate, independently of how often the sticks produce input.
+    Only the latest stick state is kept : intermediate states are overwritten (coalesced) instead of queued.
+    When the sticks are idle the last state is repeated at the keepalive rate so the autopilot does not trigger its RC failsafe.
+    """
+
+    def __init__(self, commands, rate_hz=25, keepalive_hz=2):
+        self.commands = commands
+        self.period = 1.0 / rate_hz
+        self.keepalive_period = 1.0 / keepalive_hz
+        self.state = None # Latest (pitch, roll, thrust, yaw, button_1, button_2)
+        self.origin = None # Latency origin of self.state
+        self.pending = False # True when self.state has not been sent yet
+        self.coalesced = 0 # Number of states overwritten before they could be sent
+        self.sent = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def update(self, pitch, roll, thrust, yaw, button_1, button_2, origin=None):
+        """
+        Replace the stick state to send. Never blocks on the link.
+        origin is the LatencyTracker timestamp of the input that produced this state.
+        """
+        with self.lock:
+            if self.pending:
+                self.coalesced += 1
+            self.state = (pitch, roll, thrust, yaw, button_1, button_2)
+            self.origin = origin
+            self.pending = True
+
+    def start(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name="manual-control", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        last_send = 0.0
+        next_tick = time.monotonic()
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            with self.lock:
+                state = self.state
+                origin = self.origin if self.pending else None # Keepalives are not measured
+                fresh = self.pending
+                self.pending = False
+
+            if state is not None and (fresh or now - last_send >= self.keepalive_period):
+                self.commands.latency.mark("schedule", origin)
+                self.commands.manual_command(*state, origin=origin)
+                self.sent += 1
+                last_send = now
+
+            # Fixed rate : skip missed ticks instead of sending a burst to catch up
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self.stopped.wait(delay)
+            else:
+                next_tick = time.monotonic()
+
 class Mapping:
 
-    def __init__(self):
+    def __init__(self, rate_hz=25, keepalive_hz=2, commands=None):
         super().__init__()
-        self.commands = Protocol()
+        self.commands = commands if commands is not None else Protocol()
+        self.scheduler = ManualControlScheduler(self.commands, rate_hz, keepalive_hz)
+        self.buttons = 0 # Bitmask of pressed buttons, bit n is button n (see BUTTON_NAMES)
+        self.recorder = None # recording.Recorder receiving every snapshot passed to handle_event
+
+    def handle_button(self, event):
+        """
+        Update the button bitmask from a JOYBUTTONDOWN / JOYBUTTONUP event. Returns True if the event was a button event.
+        """
+        import pygame # pygame is only needed with a physical controller, replays run without it
+
+        if event.type == pygame.JOYBUTTONDOWN:
+            self.buttons |= 1 << event.button
+        elif event.type == pygame.JOYBUTTONUP:
+            self.buttons &= ~(1 << event.button)
+        else:
+            return False
+        return True
 
-    def handle_event(self, joystick_values):
+    def handle_event(self, joystick_values, origin=None):
+        self.commands.latency.mark("handle_event", origin)
+        if self.recorder is not None:
+            self.recorder.record(joystick_values, self.buttons)
 
         pitch = joystick_values["Right stick Y"]
         roll = joystick_values["Left stick X"]
         thrust = joystick_values["Left stick Y"] 
         yaw = joystick_values["Right stick X"]
-        button_1 = 0
-        button_2 = 0
+        button_1 = self.buttons & 0xFFFF # buttons 0-15
+        button_2 = (self.buttons >> 16) & 0xFFFF # buttons 16-31
 
-        self.commands.manual_command(pitch, roll, thrust, yaw, button_1, button_2)
+        self.scheduler.update(pitch, roll, thrust, yaw, button_1, button_2, origin)
+
+    # Map axis and button indexes to their names
+    AXIS_NAMES = {
+        0: "Left stick X", # -1 left to 1 right
+        1: "Left stick Y", # -1 up to 1 down
+        2: "Right stick X", # -1 left to 1 right
+        3: "Right stick Y", # -1 up to 1 down
+        4: "Left Trigger", # -1 to 1
+        5: "Right trigger" # -1 to 1
+    }
+
+    # Per-axis transforms to MANUAL_CONTROL values in [-1000,1000]. Stick Y axes are inverted so that up/forwards is positive.
+    AXIS_TRANSFORMS = {
+        0: AxisTransform(), # roll
+        1: AxisTransform(invert=True), # thrust
+        2: AxisTransform(), # yaw
+        3: AxisTransform(invert=True), # pitch
+        4: AxisTransform(deadzone=0, expo=0), # left trigger
+        5: AxisTransform(deadzone=0, expo=0) # right trigger
+    }
+
+    BUTTON_NAMES = {
+        0: "A", # boolean
+        1: "B", # boolean
+        2: "X", # boolean
+        3: "Y", # boolean
+        4: "Left bumper", # boolean
+        5: "Right bumper", # boolean
+        6: "Select", # boolean
+        7: "Start", # boolean
+        8: "Left stick", # boolean
+        9: "Right stick" # boolean
+    }
+
+    def open_joysticks(self):
+        """
+        Initialize Pygame and open every connected joystick once. The handles are cached and reused by every read.
+        """
+        import pygame
 
-    def main(self):
-        # Initialize Pygame and the joystick module
         pygame.init()
         pygame.joystick.init()
 
-        # Get the number of connected joysticks
-        joystick_count = pygame.joystick.get_count()
-
-        # Create a dictionary to map axis and button indexes to their names
-        axis_names = {
-            0: "Left stick X", # -1 left to 1 right
-            1: "Left stick Y", # -1 up to 1 down
-            2: "Right stick X", # -1 left to 1 right
-            3: "Right stick Y", # -1 up to 1 down
-            4: "Left Trigger", # -1 to 1
-            5: "Right trigger" # -1 to 1
-        }
-
-        button_names = {
-            0: "A", # boolean
-            1: "B", # boolean
-            2: "X", # boolean
-            3: "Y", # boolean
-            4: "Left bumper", # boolean
-            5: "Right bumper", # boolean
-            6: "Select", # boolean
-            7: "Start", # boolean
-            8: "Left stick", # boolean
-            9: "Right stick" # boolean
-        }
+        self.joysticks = []
+        self.buttons = 0
+        for i in range(pygame.joystick.get_count()):
+            joystick = pygame.joystick.Joystick(i)
+            joystick.init()
+            self.joysticks.append((joystick, joystick.get_numaxes()))
+
+            # Seed the button bitmask once, it is then kept up to date by handle_button
+            for k in range(min(joystick.get_numbuttons(), 32)):
+                if joystick.get_button(k):
+                    self.buttons |= 1 << k
+
+        return self.joysticks
+
+    def read_joysticks(self, joystick_values):
+        """
+        Read every axis of the cached joysticks into joystick_values. Axes with a transform are stored as MANUAL_CONTROL integers.
+        Buttons are not polled, they are tracked in self.buttons by handle_button.
+        """
+        for joystick, num_axes in self.joysticks:
+            # Iterate through each axis of the current joystick and add it to the dictionary
+            for j in range(num_axes):
+                transform = self.AXIS_TRANSFORMS.get(j)
+                value = joystick.get_axis(j)
+                joystick_values[self.AXIS_NAMES.get(j, f"Axis {j}")] = transform(value) if transform else value
+
+        return joystick_values
+
+    def sample(self, rate_hz=100, threshold=10):
+        """
+        Sampler mode : poll the joysticks at a fixed rate and call handle_event only when a value changed by more than threshold.
+
+        Args:
+            rate_hz: Sampling rate in Hz.
+            threshold: Minimum change of a transformed axis value (in MANUAL_CONTROL units, [-1000,1000]) to emit a new snapshot. Any change of a
+                raw axis (without transform, in [-1,1] units) or of a button is emitted.
+        """
+        import pygame
+
+        self.open_joysticks()
+        self.scheduler.start()
+
+        transformed_keys = {self.AXIS_NAMES.get(j, f"Axis {j}") for j in self.AXIS_TRANSFORMS}
+        period = 1.0 / rate_hz
+        last_values = {}
+        last_buttons = self.buttons
+        joystick_values = {}
+        next_tick = time.monotonic()
+        while True:
+            # Only button events are used, axes are polled through the cached handles
+            origin = self.commands.latency.now()
+            for event in pygame.event.get():
+                self.handle_button(event)
+            self.read_joysticks(joystick_values)
+
+            changed = self.buttons != last_buttons or len(last_values) != len(joystick_values) or any(
+                abs(value - last_values[key]) > (threshold if key in transformed_keys else 0) for key, value in joystick_values.items()
+            )
+            if changed:
+                last_values = dict(joystick_values)
+                last_buttons = self.buttons
+                self.handle_event(last_values, origin)
+
+            # Sleep until the next tick, skipping ticks that were missed instead of bursting to catch up
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+    def main(self):
+        import pygame
+
+        self.open_joysticks()
+        self.scheduler.start()
 
         # Create an empty dictionary for the joystick values
         joystick_values = {}
         while True:
             for event in pygame.event.get():
-                # Iterate through each joystick
-                for i in range(joystick_count):
-                    joystick = pygame.joystick.Joystick(i)
-                    joystick.init()
-
-                    # Get the number of axes and buttons for the current joystick
-                    num_axes = joystick.get_numaxes()
-                    num_buttons = joystick.get_numbuttons()
-
-                    # Iterate through each axis of the current joystick and add it to the dictionary
-                    for j in range(num_axes):
-                        axis_value = joystick.get_axis(j)
-                        axis_name = axis_names.get(j, f"Axis {j}")
-                        joystick_values[axis_name] = axis_value
-
-                    # Iterate through each button of the current joystick and add it to the dictionary
-                    for k in range(num_buttons):
-                        button_value = joystick.get_button(k)
-                        button_name = button_names.get(k, f"Button {k}")
-                        joystick_values[button_name] = button_value
+                origin = self.commands.latency.now()
+                self.handle_button(event)
+                self.read_joysticks(joystick_values)
 
                 # Print the dictionary of joystick values
-                joystick_values = {key: float("{:.3f}".format(value)) for key, value in joystick_values.items()}
-                print("Joystick values:", joystick_values)
-                self.handle_event(joystick_values)
+                print("Joystick values:", joystick_values, "buttons:", bin(self.buttons))
+                self.handle_event(joystick_values, origin)
 
 if "__main__" == __name__:
     control = Mapping()
@@ -0,0 +1,110 @@
+"""
+Demultiplex the messages read by the single receive loop of a connection to their subscribers.
+Subscribers are either callbacks, run on the receive thread, or bounded queues consumed by other threads.
+A full queue drops its oldest message and counts it, the receive loop never blocks on a slow consumer.
+"""
+
+import queue
+import threading
+import traceback
+from mavlink_dialect import mavutil
+
+ALL_MESSAGES = "*" # Subscribe to every message type
+
+
+class Subscription:
+
+    def __init__(self, msg_type, callback=None, maxsize=0, name=None, rate_hz=None, passive=False):
+        self.msg_type = msg_type
+        self.rate_hz = rate_hz # Rate the subscriber needs, used by the StreamManager
+        self.passive = passive # Only receives the messages decoded for the other subscribers
+        self.callback = callback
+        self.queue = queue.Queue(maxsize) if callback is None else None
+        self.name = name or (getattr(callback, "__qualname__", None) if callback else None) or f"{msg_type} queue"
+        self.delivered = 0
+        self.dropped = 0
+
+    def deliver(self, msg):
+        if self.callback is not None:
+            self.callback(msg)
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(msg)
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+        self.delivered += 1
+
+    def get(self, timeout=None):
+        """
+        Next message of a queue subscription, None on timeout.
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class MessageDispatcher:
+
+    def __init__(self):
+        self.subscriptions = {} # message type -> tuple of Subscription, replaced (never mutated) so dispatch reads it without locking
+        self.wanted_ids = frozenset() # Message ids with at least one active subscriber, None when ALL_MESSAGES is subscribed
+        self.lock = threading.Lock()
+
+    def update_wanted_ids(self):
+        active = self.subscribed_types()
+        if ALL_MESSAGES in active:
+            self.wanted_ids = None
+        else:
+            ids = (getattr(mavutil.mavlink, 'MAVLINK_MSG_ID_' + msg_type, None) for msg_type in active)
+            self.wanted_ids = frozenset(msgid for msgid in ids if msgid is not None)
+
+    def subscribe(self, msg_type, callback=None, maxsize=100, name=None, rate_hz=None, passive=False):
+        """
+        Subscribe to a message type (ex : 'HEARTBEAT', or ALL_MESSAGES).
+        With a callback, it is called with every message on the receive thread and must not block.
+        Without, the returned Subscription holds a bounded queue of at most maxsize messages, read with Subscription.get.
+        rate_hz is the rate at which the subscriber needs a periodic message, None for event driven messages.
+        A passive subscription does not make the receive loop decode its messages (see wanted_ids) : it only receives the messages
+        decoded for the other subscribers, ex : the telemetry cache of every type.
+        """
+        subscription = Subscription(msg_type, callback, maxsize, name, rate_hz, passive)
+        with self.lock:
+            self.subscriptions[msg_type] = self.subscriptions.get(msg_type, ()) + (subscription,)
+            self.update_wanted_ids()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            remaining = tuple(s for s in self.subscriptions.get(subscription.msg_type, ()) if s is not subscription)
+            if remaining:
+                self.subscriptions[subscription.msg_type] = remaining
+            else:
+                self.subscriptions.pop(subscription.msg_type, None)
+            self.update_wanted_ids()
+
+    def dispatch(self, msg):
+        subscriptions = self.subscriptions
+        for subscription in subscriptions.get(msg.get_type(), ()) + subscriptions.get(ALL_MESSAGES, ()):
+            try:
+                subscription.deliver(msg)
+            except Exception:
+                traceback.print_exc()
+
+    def subscribed_types(self):
+        """
+        Message types with at least one active (not passive) subscription.
+        """
+        return {msg_type for msg_type, subscriptions in self.subscriptions.items() if any(not s.passive for s in subscriptions)}
+
+    def stats(self):
+        """
+        Returns {subscriber name: (delivered, dropped)} for every subscription.
+        """
+        return {s.name: (s.delivered, s.dropped) for subscriptions in self.subscriptions.values() for s in subscriptions}
@@ -0,0 +1,233 @@
+"""
+Geofence upload. Fences are written with the fence commands of CommandProtocol and uploaded with the mission protocol (mission_type FENCE).
+
+Surveyed boundaries have far more vertices than the autopilot can store. Polygons are simplified with Douglas-Peucker : every vertex
+removed is within tolerance metres of the simplified edges, in both directions. To stay conservative the simplified polygon is then
+offset by the tolerance, inwards for inclusion polygons and outwards for exclusion polygons, so the fence never allows more than the
+surveyed boundary. Computations are done in a local metric frame (equirectangular around the polygon), exact enough for fences.
+    plan = FencePlan(tolerance=2.0)
+    plan.add_inclusion(boundary) # [(latitude, longitude), ...]
+    plan.add_exclusion(building)
+    plan.upload(protocol, max_vertices=100).result()
+"""
+
+import math
+import numpy as np
+from mavlink_dialect import mavutil
+from mission import MissionBuilder
+
+EARTH_RADIUS = 6378137.0 # metres
+MITER_LIMIT = 4 # Longest miter of an offset, in multiples of the offset distance : sharper vertices are bevelled
+
+
+def to_local(points, origin):
+    """
+    (latitude, longitude) degrees -> (x east, y north) metres around origin.
+    """
+    points = np.asarray(points, dtype=float)
+    scale = math.radians(1) * EARTH_RADIUS
+    return np.column_stack((
+        (points[:, 1] - origin[1]) * scale * math.cos(math.radians(origin[0])),
+        (points[:, 0] - origin[0]) * scale,
+    ))
+
+
+def to_global(xy, origin):
+    scale = math.radians(1) * EARTH_RADIUS
+    return np.column_stack((
+        origin[0] + xy[:, 1] / scale,
+        origin[1] + xy[:, 0] / (scale * math.cos(math.radians(origin[0]))),
+    ))
+
+
+def signed_area(xy):
+    """
+    Shoelace area, positive for a counter-clockwise polygon.
+    """
+    x, y = xy[:, 0], xy[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def segment_distances(xy, start, end):
+    """
+    Distance of the points strictly between start and end to the segment [start, end].
+    """
+    a = xy[start]
+    ab = xy[end] - a
+    ap = xy[start + 1:end] - a
+    length2 = float(np.dot(ab, ab))
+    if length2 == 0:
+        return np.hypot(ap[:, 0], ap[:, 1])
+    t = np.clip(ap @ ab / length2, 0, 1)
+    d = ap - np.outer(t, ab)
+    return np.hypot(d[:, 0], d[:, 1])
+
+
+def simplify_line(xy, tolerance):
+    """
+    Douglas-Peucker : indices of the points of the open line xy kept with the given tolerance.
+    """
+    keep = np.zeros(len(xy), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(xy) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        distances = segment_distances(xy, start, end)
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+
+def simplify_polygon(xy, tolerance):
+    """
+    Douglas-Peucker on a closed polygon (first vertex not repeated), split at the vertex farthest from the first one.
+    """
+    if np.allclose(xy[0], xy[-1]):
+        xy = xy[:-1]
+    if len(xy) <= 3:
+        return xy
+    far = int(np.argmax(np.hypot(*(xy - xy[0]).T)))
+    first = simplify_line(xy[:far + 1], tolerance)
+    second = simplify_line(np.vstack((xy[far:], xy[:1])), tolerance) + far
+    return xy[np.concatenate((first, second[1:-1]))]
+
+
+def offset_polygon(xy, distance):
+    """
+    Move every edge of the polygon by distance metres outwards (inwards if negative), vertices on the miter of their two edges.
+    Where the two moved edges meet, the miter is kept whatever its length : moving the vertex less would leave it on the unsafe side.
+    Where they part, a vertex sharper than MITER_LIMIT is bevelled : replaced by the ends of the two moved edges.
+    """
+    if signed_area(xy) < 0:
+        return offset_polygon(xy[::-1], distance)[::-1]
+    edges = np.roll(xy, -1, axis=0) - xy
+    lengths = np.hypot(edges[:, 0], edges[:, 1])[:, None]
+    normals = np.column_stack((edges[:, 1], -edges[:, 0])) / lengths # Outward normals of a counter-clockwise polygon
+    previous = np.roll(normals, 1, axis=0)
+    previous_edges = np.roll(edges, 1, axis=0)
+    convex = previous_edges[:, 0] * edges[:, 1] - previous_edges[:, 1] * edges[:, 0] > 0
+    cosine = 1 + np.sum(normals * previous, axis=1)
+    miter = (normals + previous) / np.maximum(cosine, 1e-12)[:, None]
+    bevel = (convex == (distance > 0)) & (cosine < 2 / MITER_LIMIT**2)
+    points = []
+    for vertex, normal, previous_normal, vertex_miter, bevelled in zip(xy, normals, previous, miter, bevel):
+        if bevelled:
+            points.append(vertex + distance * previous_normal)
+            points.append(vertex + distance * normal)
+        else:
+            points.append(vertex + distance * vertex_miter)
+    return np.array(points)
+
+
+def edge_distances(xy, points):
+    """
+    Distance of every point to the edges of the polygon xy.
+    """
+    distances = np.full(len(points), np.inf)
+    for a, b in zip(xy, np.roll(xy, -1, axis=0)):
+        ab = b - a
+        ap = points - a
+        t = np.clip(ap @ ab / max(float(np.dot(ab, ab)), 1e-12), 0, 1)
+        d = ap - np.outer(t, ab)
+        distances = np.minimum(distances, np.hypot(d[:, 0], d[:, 1]))
+    return distances
+
+
+def inside(xy, points):
+    """
+    Whether each point is inside the polygon xy (ray casting), undefined for the points on an edge.
+    """
+    a = xy
+    b = np.roll(xy, -1, axis=0)
+    x = points[:, 0, None]
+    y = points[:, 1, None]
+    crossing = (a[:, 1] <= y) != (b[:, 1] <= y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xs = a[:, 0] + (y - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    return np.sum(crossing & (xs > x), axis=1) % 2 == 1
+
+
+class FencePlan:
+    """
+    Fence made of inclusion / exclusion polygons and circles, simplified when turned into mission items.
+    """
+
+    def __init__(self, tolerance=1.0):
+        self.tolerance = tolerance # Metres
+        self.polygons = [] # (points, inclusion, inclusion group)
+        self.circles = [] # (center, radius, inclusion, inclusion group)
+        self.return_point = None
+
+    def add_inclusion(self, points, group=0):
+        self.polygons.append((points, True, group))
+
+    def add_exclusion(self, points):
+        self.polygons.append((points, False, 0))
+
+    def add_inclusion_circle(self, center, radius, group=0):
+        self.circles.append((center, radius, True, group))
+
+    def add_exclusion_circle(self, center, radius):
+        self.circles.append((center, radius, False, 0))
+
+    def set_return_point(self, latitude, longitude, altitude):
+        self.return_point = (latitude, longitude, altitude)
+
+    def simplified(self):
+        """
+        [(vertices, inclusion, group)] with the polygons simplified and offset to the safe side.
+        """
+        polygons = []
+        for points, inclusion, group in self.polygons:
+            points = np.asarray(points, dtype=float)
+            origin = points.mean(axis=0)
+            xy = to_local(points, origin)
+            simplified = simplify_polygon(xy, self.tolerance)
+            if len(simplified) < 3:
+                raise ValueError(f"Polygon reduced to {len(simplified)} vertices with a tolerance of {self.tolerance} m")
+            safe = offset_polygon(simplified, -self.tolerance if inclusion else self.tolerance)
+            if inclusion and signed_area(safe) * signed_area(simplified) <= 0:
+                raise ValueError(f"Inclusion polygon too small for a tolerance of {self.tolerance} m")
+            # Every surveyed vertex, kept or dropped by the simplification, must stay on the boundary or on the unsafe side of the fence
+            on_edge = edge_distances(safe, xy) < 1e-6
+            if inclusion and (inside(safe, xy) & ~on_edge).any():
+                raise ValueError(f"Inclusion polygon shrunk by {self.tolerance} m still contains surveyed boundary points")
+            if not inclusion and not (inside(safe, xy) | on_edge).all():
+                raise ValueError(f"Exclusion polygon grown by {self.tolerance} m does not contain the surveyed boundary")
+            polygons.append((to_global(safe, origin), inclusion, group))
+        return polygons
+
+    def items(self, max_vertices=None):
+        """
+        Mission items of the fence. ValueError if it needs more than max_vertices items.
+        """
+        builder = MissionBuilder(frame=mavutil.mavlink.MAV_FRAME_GLOBAL)
+        if self.return_point is not None:
+            builder.mav_cmd_nav_fence_return_point(*self.return_point)
+        for vertices, inclusion, group in self.simplified():
+            for latitude, longitude in vertices:
+                if inclusion:
+                    builder.mav_cmd_nav_fence_polygon_vertex_inclusion(len(vertices), group, float(latitude), float(longitude))
+                else:
+                    builder.mav_cmd_nav_fence_polygon_vertex_exclusion(len(vertices), float(latitude), float(longitude))
+        for (latitude, longitude), radius, inclusion, group in self.circles:
+            if inclusion:
+                builder.mav_cmd_nav_fence_circle_inclusion(radius, group, latitude, longitude)
+            else:
+                builder.mav_cmd_nav_fence_circle_exclusion(radius, latitude, longitude)
+
+        if max_vertices is not None and len(builder.items) > max_vertices:
+            raise ValueError(f"Fence needs {len(builder.items)} items, the vehicle stores {max_vertices} : increase the tolerance")
+        return builder.items
+
+    def upload(self, protocol, max_vertices=None):
+        """
+        Replace the fence of the vehicle, see MissionTransfer.upload. max_vertices is the fence capacity of the vehicle, not checked if None.
+        """
+        return protocol.missions.upload(self.items(max_vertices), mavutil.mavlink.MAV_MISSION_TYPE_FENCE)
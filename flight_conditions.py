@@ -7,12 +7,10 @@ Visibility: Good visibility is crucial when operating a drone. Low visibility co
 Air Pressure: Changes in air pressure can affect a drone's altitude and stability, so it is essential to be aware of the current air pressure in the area where you are flying.
 Obstacles: Before flying, it is crucial to identify potential obstacles in the area, such as buildings, trees, or power lines, to avoid collisions.
 """
-import geocoder
-import requests
 import socket
-import geocoder
 import json
-from geopy.geocoders import Nominatim
+
+# requests and geocoder are only imported by the functions that query online services, they are not needed to fly
 
 # AIRMAP_API_KEY = ""
 # OPEN_WATHER_API_KEY = ""
@@ -20,7 +18,7 @@ from geopy.geocoders import Nominatim
 @staticmethod
 def check_internet_connection():
     try:
-        socket.create_connection(("8.8.8.8", 53))
+        socket.create_connection(("8.8.8.8", 53), timeout=2)
         return True
     except OSError:
         pass
@@ -30,6 +28,8 @@ def atmospheric_conditions(latitude = str, longitude = str) -> dict:
     """
     Returns the atmospheric conditions at the UAV's current location.
     """
+    import requests
+
     conditions = {}
 
     url = f"http://api.openweathermap.org/data/2.5/weather?lat={latitude}&lon={longitude}&appid={OPEN_WATHER_API_KEY}&units=metric"
@@ -50,6 +50,7 @@ def get_flight_restrictions(latitude, longitude):
     """
     Returns the flight restrictions at the UAV's current location.
     """
+    import requests
 
     # Make the request to the AirMap API
     response = requests.get(
@@ -72,17 +73,27 @@ def get_flight_restrictions(latitude, longitude):
         print(f'Request failed with status code {response.status_code}')
 
 @staticmethod
-def get_gps_location():
+def get_gps_location(vehicle=None):
+    """
+    Returns [latitude, longitude] : the last position reported by the vehicle (a command_protocol.Protocol) if there is one, else the IP location.
+    """
+    if vehicle is not None:
+        position = vehicle.telemetry.get('GLOBAL_POSITION_INT', max_age=5)
+        if position is not None:
+            return [position.lat / 1e7, position.lon / 1e7]
+
+    import geocoder
+
     latitude_longitude = geocoder.ip('me').latlng 
     return latitude_longitude
 
-def main():
+def main(vehicle=None):
     """
     Main function.
     """
     internet_connection = check_internet_connection()
     if internet_connection:
-        latitude_longitude = get_gps_location()
+        latitude_longitude = get_gps_location(vehicle)
         latitude = latitude_longitude[0]
         longitude = latitude_longitude[1]
 
@@ -0,0 +1,229 @@
+"""
+Zero-copy MAVLink receive path.
+
+The FrameReceiver reads the connection into a preallocated bytearray with recv_into / readinto and walks the frame headers through a
+memoryview. Frames whose message id has no subscriber are skipped without CRC check nor payload decode. The others are checked and
+wrapped in a LazyMessage, which answers get_type() / get_srcSystem() from the header and only unpacks the payload when a field is read.
+
+pymavlink's per-connection bookkeeping (vehicle.messages, packet loss, signing) is bypassed in this mode.
+UDP, TCP and serial connections are supported.
+"""
+
+import select
+import socket
+import struct
+import time
+from mavlink_dialect import mavutil
+
+MAVLINK_STX_V1 = 0xFE
+MAVLINK_STX_V2 = 0xFD
+MAVLINK_IFLAG_SIGNED = 0x01
+SIGNATURE_LEN = 13
+CRC = struct.Struct("<H")
+
+
+class LazyMessage:
+    """
+    Received frame decoded on first access to one of its fields.
+    """
+    __slots__ = ("frame", "msgid", "system", "component", "mav", "decoded")
+
+    def __init__(self, frame, msgid, system, component, mav):
+        self.frame = frame
+        self.msgid = msgid
+        self.system = system
+        self.component = component
+        self.mav = mav
+        self.decoded = None
+
+    def get_type(self):
+        return mavutil.mavlink.mavlink_map[self.msgid].msgname
+
+    def get_msgId(self):
+        return self.msgid
+
+    def get_srcSystem(self):
+        return self.system
+
+    def get_srcComponent(self):
+        return self.component
+
+    def decode(self):
+        if self.decoded is None:
+            self.decoded = self.mav.decode(self.frame)
+        return self.decoded
+
+    def __getattr__(self, name):
+        return getattr(self.decode(), name)
+
+    def __repr__(self):
+        return repr(self.decode())
+
+
+class FrameReceiver:
+
+    def __init__(self, vehicle, size=65536):
+        self.vehicle = vehicle
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.start = 0 # First unparsed byte
+        self.end = 0 # End of the received data
+        self.received = 0 # Frames seen
+        self.skipped = 0 # Frames skipped by the header filter
+        self.errors = 0 # Frames with a bad CRC, and resynchronisations
+
+        if isinstance(vehicle, mavutil.mavudp):
+            self.read = self.read_udp
+        elif isinstance(vehicle, mavutil.mavtcp):
+            self.read = self.read_socket
+        elif isinstance(vehicle, mavutil.mavserial):
+            self.read = self.read_serial
+        else:
+            raise TypeError(f"Zero-copy receive is not supported on {type(vehicle).__name__} connections")
+
+    @staticmethod
+    def supported(vehicle):
+        return isinstance(vehicle, (mavutil.mavudp, mavutil.mavtcp, mavutil.mavserial))
+
+    def wait(self, timeout):
+        if self.vehicle.fd is None:
+            return True
+        return bool(select.select([self.vehicle.fd], [], [], timeout)[0])
+
+    def compact(self):
+        """
+        Move the unparsed tail to the start of the buffer so the next read has room.
+        """
+        if self.start:
+            remaining = self.end - self.start
+            self.buffer[:remaining] = self.view[self.start:self.end]
+            self.start = 0
+            self.end = remaining
+
+    def read_udp(self, timeout):
+        if not self.wait(timeout):
+            return 0
+        self.compact()
+        try:
+            count, address = self.vehicle.port.recvfrom_into(self.view[self.end:])
+        except (BlockingIOError, ConnectionRefusedError):
+            return 0
+        # Same client bookkeeping as mavudp.recv so replies keep going to the sender
+        if self.vehicle.udp_server:
+            self.vehicle.clients.add(address)
+            self.vehicle.clients_last_alive[address] = time.time()
+        elif self.vehicle.broadcast:
+            self.vehicle.last_address = address
+        self.end += count
+        return count
+
+    def read_socket(self, timeout):
+        port = self.vehicle.port
+        if port is None:
+            # Closed by a failed reconnection
+            raise ConnectionError("TCP connection closed")
+        # pymavlink replaces the socket when it reconnects, vehicle.fd keeps the first one
+        if not select.select([port], [], [], timeout)[0]:
+            return 0
+        self.compact()
+        try:
+            count = port.recv_into(self.view[self.end:])
+        except (BlockingIOError, socket.timeout):
+            return 0
+        except ConnectionResetError:
+            count = 0
+        if count == 0:
+            self.disconnected()
+            return 0
+        self.end += count
+        return count
+
+    def disconnected(self):
+        """
+        The TCP peer closed the connection : reconnect with pymavlink when the connection has autoreconnect, otherwise stop reading.
+        """
+        self.start = self.end = 0 # The partial frame will not be completed
+        if not self.vehicle.autoreconnect:
+            raise ConnectionError("TCP connection closed by peer")
+        self.vehicle.handle_eof()
+
+    def read_serial(self, timeout):
+        self.compact()
+        if self.vehicle.fd is not None:
+            if not self.wait(timeout):
+                return 0
+            waiting = max(self.vehicle.port.in_waiting, 1)
+        else:
+            waiting = self.vehicle.port.in_waiting
+        count = self.vehicle.port.readinto(self.view[self.end:self.end + waiting]) or 0
+        self.end += count
+        return count
+
+    def frames(self, wanted, timeout=0.1):
+        """
+        Read the connection once and return the LazyMessages of the complete frames received whose id is in wanted (None for every id).
+        """
+        self.read(timeout)
+        messages = []
+        buffer = self.buffer
+        mav = self.vehicle.mav
+        mavlink_map = mavutil.mavlink.mavlink_map
+        while self.end - self.start >= 8:
+            start = self.start
+            stx = buffer[start]
+            if stx == MAVLINK_STX_V2:
+                if self.end - start < 10:
+                    break
+                length = 12 + buffer[start + 1]
+                if buffer[start + 2] & MAVLINK_IFLAG_SIGNED:
+                    length += SIGNATURE_LEN
+                msgid = buffer[start + 7] | buffer[start + 8] << 8 | buffer[start + 9] << 16
+                system = buffer[start + 5]
+                component = buffer[start + 6]
+                payload_end = start + 10 + buffer[start + 1]
+            elif stx == MAVLINK_STX_V1:
+                length = 8 + buffer[start + 1]
+                msgid = buffer[start + 5]
+                system = buffer[start + 3]
+                component = buffer[start + 4]
+                payload_end = start + 6 + buffer[start + 1]
+            else:
+                # Lost sync : jump to the next start marker
+                self.errors += 1
+                next_v2 = buffer.find(MAVLINK_STX_V2, start + 1, self.end)
+                next_v1 = buffer.find(MAVLINK_STX_V1, start + 1, self.end)
+                candidates = [i for i in (next_v1, next_v2) if i != -1]
+                self.start = min(candidates) if candidates else self.end
+                continue
+
+            if self.end - start < length:
+                break
+            self.start = start + length
+            self.received += 1
+
+            if wanted is not None and msgid not in wanted:
+                self.skipped += 1
+                continue
+            message_class = mavlink_map.get(msgid)
+            if message_class is None:
+                self.skipped += 1
+                continue
+
+            crc = mavutil.mavlink.x25crc(self.view[start + 1:payload_end])
+            crc.accumulate(bytes((message_class.crc_extra,)))
+            if crc.crc != CRC.unpack_from(buffer, payload_end)[0]:
+                # Not a frame after all, resume the search right after its start marker
+                self.errors += 1
+                self.received -= 1
+                self.start = start + 1
+                continue
+
+            messages.append(LazyMessage(bytearray(self.view[start:start + length]), msgid, system, component, mav))
+
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif self.end == len(buffer) and self.start == 0:
+            # A buffer full of garbage without any frame : drop it
+            self.errors += 1
+            self.start = self.end = 0
+        return messages
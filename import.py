@@ -19,7 +19,7 @@ def common_cmd_to_methods():
     # find the MAV_CMD enum
     enum = root.find(".//enum[@name='MAV_CMD']")
 
-    all_methods = "from pymavlink import mavutil\n\n\n"
+    all_methods = "from mavlink_dialect import mavutil\n\n\n"
     all_methods += "class mav_cmd(object):\n\n"
 
     # iterate over the enum entries
@@ -61,7 +61,7 @@ def common_cmd_to_methods():
         method += '        """\n        ' + entry_desc + "\n" + '        """' + "\n" 
         method += "        " + command + "\n" 
         method += "        " + parameters + "\n"
-        method += "        self.send_mavlink_command(command, params)\n\n"
+        method += "        return self.send_mavlink_command(command, params)\n\n"
 
         all_methods += method
         
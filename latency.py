@@ -0,0 +1,126 @@
+"""
+Input-to-wire latency instrumentation.
+Every stick state carries the time it was read (its origin). Each stage of the control path records the time elapsed since that origin
+into a fixed-size histogram, so the cost of the whole path can be read as p50 / p99 / max per stage.
+"""
+
+import threading
+import time
+
+
+class LatencyHistogram:
+    """
+    Fixed-size latency histogram in microseconds, 4 buckets per power of two (25% resolution), constant memory whatever the sample count.
+    """
+    SIZE = 120 # Covers up to 2**29 us (about 9 minutes), larger values go to the last bucket
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * self.SIZE
+        self.count = 0
+        self.max = 0
+
+    @staticmethod
+    def index(us):
+        if us < 4:
+            return us
+        shift = us.bit_length() - 3 # Keep the 3 most significant bits : 4..7
+        return shift * 4 + (us >> shift)
+
+    @staticmethod
+    def upper_bound(index):
+        """
+        Upper bound (in us) of the values stored in a bucket.
+        """
+        if index < 4:
+            return index
+        shift = index // 4 - 1
+        return ((index % 4 + 5) << shift) - 1
+
+    def add(self, ns):
+        us = ns // 1000
+        index = min(self.index(us), self.SIZE - 1)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            if us > self.max:
+                self.max = us
+
+    def percentile(self, p):
+        """
+        Returns the latency (in us) under which p percent of the samples fall.
+        """
+        with self.lock:
+            counts = list(self.counts)
+            count = self.count
+        if count == 0:
+            return 0
+        rank = count * p / 100.0
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self.upper_bound(index), self.max)
+        return self.max
+
+
+class LatencyTracker:
+    """
+    Per-stage latency histograms of the control path, measured from the origin of each stick state :
+        handle_event: input read -> Mapping.handle_event
+        schedule: input read -> picked up by the MANUAL_CONTROL scheduler
+        encode: input read -> MANUAL_CONTROL encoded
+        write: input read -> frame written to the link
+    """
+    STAGES = ("handle_event", "schedule", "encode", "write")
+
+    def __init__(self):
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+        self.reporter = None
+
+    @staticmethod
+    def now():
+        return time.perf_counter_ns()
+
+    def mark(self, stage, origin):
+        """
+        Record the time elapsed since origin (a value returned by now()) for a stage. A None origin is ignored.
+        """
+        if origin is not None:
+            self.histograms[stage].add(time.perf_counter_ns() - origin)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            with histogram.lock:
+                histogram.reset()
+
+    def report(self):
+        """
+        Returns the p50 / p99 / max of every stage as a printable string.
+        """
+        lines = ["stage          count      p50(us)    p99(us)    max(us)"]
+        for stage, histogram in self.histograms.items():
+            lines.append(f"{stage:<14} {histogram.count:<10} {histogram.percentile(50):<10} {histogram.percentile(99):<10} {histogram.max}")
+        return "\n".join(lines)
+
+    def start_reporting(self, interval):
+        """
+        Print the report every interval seconds from a daemon thread.
+        """
+        self.stop_reporting()
+        self.reporter = threading.Event()
+        stopped = self.reporter
+
+        def run():
+            while not stopped.wait(interval):
+                print(self.report())
+
+        threading.Thread(target=run, name="latency-report", daemon=True).start()
+
+    def stop_reporting(self):
+        if self.reporter is not None:
+            self.reporter.set()
+            self.reporter = None
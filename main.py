@@ -1,10 +1,11 @@
-import pygame
-import gcs.control_map
-import utils.flight_conditions
-
 SETTINGS_FILE = "C:\\Users\\pa.perrier\\Desktop\\PREDATOR\\parameters\\settings.json"
 
 def manual():
+    # Heavy dependencies are imported when flying starts, not when the module is loaded
+    import pygame
+    import gcs.control_map
+    import utils.flight_conditions
+
     # Initialize Pygame
     pygame.init()
 
@@ -0,0 +1,12 @@
+"""
+Single place where the MAVLink dialect is chosen.
+pymavlink loads the dialect named by MAVLINK_DIALECT / MAVLINK20 when mavutil is first imported, so every module imports mavutil from
+here : the dialect is loaded once, as MAVLink 2, and shared by all of them. Both variables can still be overridden from the environment.
+"""
+
+import os
+
+os.environ.setdefault("MAVLINK20", "1")
+os.environ.setdefault("MAVLINK_DIALECT", "ardupilotmega")
+
+from pymavlink import mavutil
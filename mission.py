@@ -0,0 +1,515 @@
+"""
+Pipelined mission transfer. The mission protocol is documented at https://mavlink.io/en/services/mission.html
+
+Missions are written with the nav / do commands of CommandProtocol on a MissionBuilder, which collects them as MissionItems instead of
+sending them :
+    builder = MissionBuilder()
+    builder.mav_cmd_nav_takeoff(0, 0, 0, 0, 0, 10)
+    builder.mav_cmd_nav_waypoint(0, 2, 0, float('nan'), 48.85, 2.35, 30)
+    protocol.missions.upload(builder.items).result()
+
+The autopilot drives an upload by requesting one MISSION_ITEM_INT at a time. Waiting for each request costs a round trip per item, so
+MissionTransfer sends the items ahead of the requests, up to window items past the last one requested. The autopilot accepts items
+received in order and rejects the others, so a repeated request (or no progress for timeout seconds) means an item was lost : the
+items are sent again from the missing sequence number only. Downloads request a window of items at once and re-request the missing
+sequence numbers only, as soon as a later item shows that they were lost.
+Items are written with the bulk priority of the outbound scheduler, ArduPilot expects the home position as item 0 of a mission.
+"""
+
+import hashlib
+import math
+import struct
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from mavlink_dialect import mavutil
+from command_messages import CommandProtocol
+from command_routing import LOCAL_FRAMES, POSITIONAL_COMMANDS, scale_coordinate
+from outbound import BULK
+
+MissionItem = namedtuple("MissionItem", ["command", "frame", "params", "autocontinue"]) # params : the 7 command parameters, in degrees / metres
+
+# items : wire_item of every item, opaque_id : None if not reported, time : monotonic time the copy was confirmed
+ConfirmedMission = namedtuple("ConfirmedMission", ["digest", "items", "opaque_id", "time"])
+
+WIRE_ITEM = struct.Struct("<HBB4fiif") # command, frame, autocontinue, params 1 to 4, x, y, z
+
+MAV_MISSION_RESULT_NAMES = {entry: value.name for entry, value in mavutil.mavlink.enums['MAV_MISSION_RESULT'].items()}
+
+
+class MissionError(Exception):
+    """
+    Transfer refused by the autopilot, result is its MAV_MISSION_RESULT.
+    """
+
+    def __init__(self, result):
+        super().__init__(f"Mission transfer failed : {MAV_MISSION_RESULT_NAMES.get(result, result)}")
+        self.result = result
+
+
+class MissionBuilder(CommandProtocol):
+    """
+    Collect the nav / do commands called on it as MissionItems, in self.items.
+    """
+
+    def __init__(self, frame=mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT, autocontinue=1):
+        self.frame = frame # Frame of the positional commands
+        self.autocontinue = autocontinue
+        self.items = []
+
+    def send_mavlink_command(self, command, params, frame=None):
+        if len(params) < 7:
+            params = list(params) + [0] * (7 - len(params))
+        if frame is None:
+            frame = self.frame if command in POSITIONAL_COMMANDS else mavutil.mavlink.MAV_FRAME_MISSION
+        item = MissionItem(command, frame, tuple(params), self.autocontinue)
+        self.items.append(item)
+        return item
+
+
+def item_coordinates(item):
+    """
+    x / y of the MISSION_ITEM_INT of an item : scaled latitude / longitude for positional commands, params 5 and 6 as is for the others.
+    """
+    if item.command in POSITIONAL_COMMANDS:
+        return scale_coordinate(item.params[4], item.frame), scale_coordinate(item.params[5], item.frame)
+    return int(item.params[4] or 0), int(item.params[5] or 0)
+
+
+def wire_item(item):
+    """
+    Fields of the MISSION_ITEM_INT of an item packed as bytes (float32 params, int32 x / y), to compare missions the way the autopilot
+    stores them. NaN params (yaw left to the autopilot) are packed as the same quiet NaN, so equal items always give equal bytes.
+    """
+    x, y = item_coordinates(item)
+    params = [math.nan if math.isnan(param) else param for param in (item.params[:4] + item.params[6:7])]
+    return WIRE_ITEM.pack(item.command, item.frame, item.autocontinue, *params[:4], x, y, params[4])
+
+
+def wire_position(wire):
+    """
+    Command and x / y of a wire_item. The autopilot may store the params and the altitude of an item with less precision than they
+    were sent (ArduPilot does not keep the yaw of a waypoint), these fields are read back unchanged.
+    """
+    fields = WIRE_ITEM.unpack(wire)
+    return fields[0], fields[7], fields[8]
+
+
+def mission_digest(items):
+    return hashlib.sha1(b"".join(items)).hexdigest()
+
+
+def changed_ranges(old, new, max_gap=3):
+    """
+    (start, end) inclusive ranges of the items that differ between two missions of the same length.
+    Ranges less than max_gap unchanged items apart are merged : resending a few items is cheaper than another partial write handshake.
+    """
+    ranges = []
+    for seq, (old_item, new_item) in enumerate(zip(old, new)):
+        if old_item != new_item:
+            if ranges and seq - ranges[-1][1] <= max_gap + 1:
+                ranges[-1][1] = seq
+            else:
+                ranges.append([seq, seq])
+    return [tuple(r) for r in ranges]
+
+
+def mission_item(msg):
+    """
+    MissionItem of a received MISSION_ITEM_INT.
+    """
+    x, y = msg.x, msg.y
+    if msg.command in POSITIONAL_COMMANDS:
+        scale = 1e4 if msg.frame in LOCAL_FRAMES else 1e7
+        x, y = x / scale, y / scale
+    return MissionItem(msg.command, msg.frame, (msg.param1, msg.param2, msg.param3, msg.param4, x, y, msg.z), msg.autocontinue)
+
+
+class MissionTransfer:
+    """
+    Mission upload / download of one vehicle. One transfer runs at a time, its Future resolves when the autopilot confirms it.
+    """
+    def __init__(self, protocol, window=8, timeout=1.0, retries=5, verify_items=8):
+        self.protocol = protocol
+        self.window = window # Items sent (or requested) ahead of the autopilot
+        self.verify_items = verify_items # Items spread over the mission read back by update to check the mission on board
+        self.timeout = timeout # Seconds without progress before sending again the missing items
+        self.retries = retries # Timeouts without progress before the transfer fails with TimeoutError
+        self.lock = threading.Lock()
+        self.future = None # Future of the running transfer
+        self.subscriptions = []
+        self.progress = threading.Event() # Set on every step of the transfer, watched for timeouts
+        self.retransmitted = 0 # Items sent (or requested) again over all transfers
+        self.confirmed = {} # mission_type -> ConfirmedMission, last mission uploaded to (or downloaded from) the autopilot
+        self.opaque_id = None # Id of the mission on board reported by the last transfer, recent dialects only
+
+    def claim(self, mission_type):
+        """
+        Future of a new transfer, RuntimeError while another one is running.
+        """
+        with self.lock:
+            if self.future is not None and not self.future.done():
+                raise RuntimeError("A mission transfer is already running")
+            self.future = Future()
+            self.future.set_running_or_notify_cancel()
+            self.mission_type = mission_type
+            self.progress.clear()
+            return self.future
+
+    def begin(self, future, handlers, start):
+        self.subscriptions = [self.protocol.subscribe(msg_type, handler, name="mission") for msg_type, handler in handlers.items()]
+        future.add_done_callback(self.end)
+        start()
+        threading.Thread(target=self.watch, args=(future, start), name="mission-transfer", daemon=True).start()
+        return future
+
+    def end(self, future):
+        for subscription in self.subscriptions:
+            self.protocol.dispatcher.unsubscribe(subscription)
+
+    def watch(self, future, start):
+        stalls = 0
+        while not future.done():
+            if self.progress.wait(self.timeout):
+                self.progress.clear()
+                stalls = 0
+            elif stalls < self.retries:
+                stalls += 1
+                self.resend(start)
+            else:
+                self.fail(TimeoutError(f"Mission transfer stalled for {self.retries} timeouts"))
+
+    def finish(self, result):
+        future = self.future
+        if not future.done():
+            future.set_result(result)
+
+    def fail(self, exception):
+        future = self.future
+        if not future.done():
+            if self.uploading:
+                # The mission on board is no longer known
+                self.confirmed.pop(self.mission_type, None)
+            future.set_exception(exception)
+
+    def confirm(self, items):
+        """
+        Keep items as the copy of the mission on board.
+        """
+        wire_items = [wire_item(item) for item in items]
+        self.confirmed[self.mission_type] = ConfirmedMission(mission_digest(wire_items), wire_items, self.opaque_id, time.monotonic())
+
+    def accepts(self, msg):
+        return self.protocol.is_vehicle_heartbeat(msg) and getattr(msg, 'mission_type', 0) == self.mission_type
+
+    def send(self, msg):
+        self.protocol.send_message(msg, BULK)
+
+    # Upload
+
+    def upload(self, items, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION):
+        """
+        Replace the mission of mission_type with items (MissionItems). Returns a Future resolved with the number of items written.
+        """
+        items = list(items)
+        return self.write(items, 0, len(items), mission_type, self.send_count)
+
+    def write(self, items, first, stop, mission_type, start):
+        """
+        Send items[first:stop] on request of the autopilot, after start() opened the transfer.
+        """
+        future = self.claim(mission_type)
+        self.uploading = True
+        self.items = items
+        self.first = first
+        self.stop = stop # End of the items written
+        self.requested = first # Every item before it was received by the autopilot
+        self.next_item = first # Next item never sent
+        self.last_request = None
+        self.rewound = None # Last request the items were sent again from on an INVALID_SEQUENCE
+        return self.begin(future, {
+            'MISSION_REQUEST_INT': self.handle_request,
+            'MISSION_REQUEST': self.handle_request,
+            'MISSION_ACK': self.handle_upload_ack,
+        }, start)
+
+    def write_partial(self, items, start_index, end_index, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION):
+        """
+        Replace items start_index to end_index (inclusive) of the mission on board with the same items of items, the count does not change.
+        Returns a Future resolved with the number of items written.
+        """
+        def send_partial_list():
+            self.send(self.protocol.vehicle.mav.mission_write_partial_list_encode(
+                self.protocol.TARGET_SYSTEM, self.protocol.TARGET_COMPONENT, start_index, end_index, mission_type
+            ))
+
+        return self.write(list(items), start_index, end_index + 1, mission_type, send_partial_list)
+
+    def update(self, items, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION, max_gap=3):
+        """
+        Upload an edited mission, sending only the items that changed since the last mission confirmed on this vehicle (partial writes).
+        Falls back to a full upload when there is no confirmed copy, the item count changed or the mission on board is not that copy.
+        Returns a Future resolved with the number of items written.
+        """
+        items = list(items)
+        wire_items = [wire_item(item) for item in items]
+        confirmed = self.confirmed.get(mission_type)
+        if confirmed is None or len(confirmed.items) != len(items):
+            return self.upload(items, mission_type)
+
+        digest = mission_digest(wire_items)
+        ranges = changed_ranges(confirmed.items, wire_items, max_gap) if digest != confirmed.digest else []
+        result = Future()
+        result.set_running_or_notify_cancel()
+        written = 0
+
+        def next_range(previous=None):
+            nonlocal written
+            if previous is not None:
+                if previous.exception() is not None:
+                    result.set_exception(previous.exception())
+                    return
+                written += previous.result()
+            if not ranges:
+                self.confirmed[mission_type] = ConfirmedMission(digest, wire_items, self.opaque_id, time.monotonic())
+                result.set_result(written)
+                return
+            start_index, end_index = ranges.pop(0)
+            self.write_partial(items, start_index, end_index, mission_type).add_done_callback(next_range)
+
+        def uploaded(upload):
+            if upload.exception() is not None:
+                result.set_exception(upload.exception())
+            else:
+                result.set_result(upload.result())
+
+        def checked(on_board):
+            try:
+                if on_board.result():
+                    self.opaque_id = confirmed.opaque_id
+                    next_range()
+                else:
+                    self.upload(items, mission_type).add_done_callback(uploaded)
+            except Exception as e:
+                result.set_exception(e)
+
+        self.on_board(confirmed, mission_type, ranges).add_done_callback(checked)
+        return result
+
+    def on_board(self, confirmed, mission_type, ranges):
+        """
+        Whether the mission on board is still the confirmed copy, before the partial writes of ranges. Returns a Future resolved with a bool.
+        A MISSION_CURRENT received after the copy was confirmed gives the item count (without the home position on ArduPilot, 0 or
+        UINT16_MAX if not reported) and, on recent dialects, the id of the mission, which settles it. Otherwise the count and a sample of
+        the items the partial writes keep are read back from the autopilot : the neighbours of every range and verify_items items spread
+        over the mission.
+        """
+        count = len(confirmed.items)
+        result = Future()
+        result.set_running_or_notify_cancel()
+        if mission_type == mavutil.mavlink.MAV_MISSION_TYPE_MISSION:
+            # A MISSION_CURRENT received before the copy was confirmed may describe the previous mission
+            entry = self.protocol.telemetry.entry('MISSION_CURRENT')
+            if entry is not None and entry.timestamp > confirmed.time and self.protocol.is_vehicle_heartbeat(entry.msg):
+                total = getattr(entry.msg, 'total', 0)
+                if total not in (0, 0xFFFF, count, count - 1):
+                    result.set_result(False)
+                    return result
+                mission_id = getattr(entry.msg, 'mission_id', 0)
+                if mission_id and confirmed.opaque_id is not None:
+                    result.set_result(mission_id == confirmed.opaque_id)
+                    return result
+
+        def compare(download):
+            if download.exception() is not None:
+                result.set_result(False)
+                return
+            on_board_count, on_board_items = download.result()
+            result.set_result(on_board_count == count and all(
+                wire_position(wire_item(item)) == wire_position(confirmed.items[seq]) for seq, item in on_board_items.items()
+            ))
+
+        self.download(mission_type, self.verify_seqs(count, ranges, mission_type)).add_done_callback(compare)
+        return result
+
+    def verify_seqs(self, count, ranges, mission_type):
+        """
+        Sequence numbers of the items read back by on_board : the neighbours of the ranges, the last item and verify_items items spread
+        over the mission, none of them inside a range. The home position (item 0 of a mission) is updated by the autopilot, it is skipped.
+        """
+        seqs = {count - 1}
+        seqs.update(range(0, count, max(1, count // max(1, self.verify_items))))
+        for start_index, end_index in ranges:
+            seqs.update((start_index - 1, end_index + 1))
+        if mission_type == mavutil.mavlink.MAV_MISSION_TYPE_MISSION:
+            seqs.discard(0)
+        return sorted(seq for seq in seqs if 0 <= seq < count and not any(start <= seq <= end for start, end in ranges))
+
+    def send_count(self):
+        self.send(self.protocol.vehicle.mav.mission_count_encode(
+            self.protocol.TARGET_SYSTEM, self.protocol.TARGET_COMPONENT, len(self.items), self.mission_type
+        ))
+
+    def send_item(self, seq):
+        item = self.items[seq]
+        x, y = item_coordinates(item)
+        params = item.params
+        self.send(self.protocol.vehicle.mav.mission_item_int_encode(
+            self.protocol.TARGET_SYSTEM, self.protocol.TARGET_COMPONENT, seq, item.frame, item.command,
+            0, # current
+            item.autocontinue,
+            params[0], params[1], params[2], params[3], x, y, params[6],
+            self.mission_type,
+        ))
+
+    def send_window(self):
+        end = min(self.requested + self.window, self.stop)
+        while self.next_item < end:
+            self.send_item(self.next_item)
+            self.next_item += 1
+
+    def rewind(self, seq):
+        """
+        Send the items again from seq, the first one the autopilot is missing.
+        """
+        self.retransmitted += self.next_item - seq
+        self.next_item = seq
+        self.send_window()
+
+    def handle_request(self, msg):
+        if not self.accepts(msg) or not self.first <= msg.seq < self.stop:
+            return
+        with self.lock:
+            if msg.seq == self.last_request or msg.seq < self.requested:
+                # Requested again : the item was lost, and the ones sent after it were rejected
+                self.rewind(msg.seq)
+            else:
+                self.next_item = max(self.next_item, msg.seq)
+                self.requested = msg.seq
+                self.last_request = msg.seq
+                self.send_window()
+        self.progress.set()
+
+    def handle_upload_ack(self, msg):
+        if not self.accepts(msg):
+            return
+        if msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
+            self.opaque_id = getattr(msg, 'opaque_id', None)
+            if self.first == 0 and self.stop == len(self.items):
+                self.confirm(self.items)
+            self.finish(self.stop - self.first)
+        elif msg.type == mavutil.mavlink.MAV_MISSION_INVALID_SEQUENCE:
+            # An item sent ahead was rejected : the one requested last was lost. Rewind once per request, the rest of the window
+            # sent after the lost item is rejected too
+            with self.lock:
+                if self.last_request is not None and self.rewound != self.last_request:
+                    self.rewound = self.last_request
+                    self.rewind(self.requested)
+        else:
+            self.fail(MissionError(msg.type))
+
+    # Download
+
+    def download(self, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION, seqs=None):
+        """
+        Read the mission of mission_type. Returns a Future resolved with the list of MissionItems.
+        With seqs, only the items of these sequence numbers are read : the Future is resolved with (item count, {seq: MissionItem}) and
+        the confirmed copy is not replaced.
+        """
+        future = self.claim(mission_type)
+        self.uploading = False
+        self.items = None
+        self.seqs = seqs
+        self.targets = None # Sequence numbers to read, known with the count
+        self.received = 0
+        self.outstanding = {} # seq -> order of its last request, for the items requested and not received
+        self.requests = 0 # Requests sent
+        self.next_item = 0 # Index in targets of the next item never requested
+        return self.begin(future, {
+            'MISSION_COUNT': self.handle_count,
+            'MISSION_ITEM_INT': self.handle_item,
+        }, self.request_list)
+
+    def request_list(self):
+        self.send(self.protocol.vehicle.mav.mission_request_list_encode(
+            self.protocol.TARGET_SYSTEM, self.protocol.TARGET_COMPONENT, self.mission_type
+        ))
+
+    def request_item(self, seq):
+        self.outstanding[seq] = self.requests
+        self.requests += 1
+        self.send(self.protocol.vehicle.mav.mission_request_int_encode(
+            self.protocol.TARGET_SYSTEM, self.protocol.TARGET_COMPONENT, seq, self.mission_type
+        ))
+
+    def send_ack(self):
+        self.send(self.protocol.vehicle.mav.mission_ack_encode(
+            self.protocol.TARGET_SYSTEM, self.protocol.TARGET_COMPONENT, mavutil.mavlink.MAV_MISSION_ACCEPTED, self.mission_type
+        ))
+
+    def handle_count(self, msg):
+        if not self.accepts(msg):
+            return
+        with self.lock:
+            if self.items is not None:
+                return
+            self.items = [None] * msg.count
+            self.opaque_id = getattr(msg, 'opaque_id', None)
+            if self.seqs is None:
+                self.targets = range(msg.count)
+            else:
+                self.targets = sorted({seq for seq in self.seqs if 0 <= seq < msg.count})
+            for seq in self.targets[:self.window]:
+                self.request_item(seq)
+            self.next_item = min(self.window, len(self.targets))
+            done = not self.targets
+        self.progress.set()
+        if done:
+            self.complete()
+
+    def handle_item(self, msg):
+        if not self.accepts(msg):
+            return
+        with self.lock:
+            order = self.outstanding.pop(msg.seq, None) if self.items is not None else None
+            if order is None:
+                return
+            self.items[msg.seq] = mission_item(msg)
+            self.received += 1
+            # Items are answered in request order : the ones requested before this one and still outstanding were lost
+            lost = [seq for seq, requested in self.outstanding.items() if requested < order]
+            self.retransmitted += len(lost)
+            for seq in lost:
+                self.request_item(seq)
+            if self.next_item < len(self.targets):
+                self.request_item(self.targets[self.next_item])
+                self.next_item += 1
+            done = self.received == len(self.targets)
+        self.progress.set()
+        if done:
+            self.complete()
+
+    def complete(self):
+        self.send_ack()
+        if self.seqs is None:
+            self.confirm(self.items)
+            self.finish(self.items)
+        else:
+            self.finish((len(self.items), {seq: self.items[seq] for seq in self.targets}))
+
+    def resend(self, start):
+        """
+        No progress for timeout seconds : send again what the autopilot is missing.
+        """
+        with self.lock:
+            if self.items is None or (self.uploading and self.last_request is None):
+                # The count (or the list request) itself was lost
+                start()
+            elif self.uploading:
+                self.rewind(self.requested)
+            else:
+                outstanding = list(self.outstanding)
+                self.retransmitted += len(outstanding)
+                for seq in outstanding:
+                    self.request_item(seq)
@@ -0,0 +1,85 @@
+"""
+Priority-aware outbound scheduler : a single writer thread per connection sends frames from four priority classes.
+The writer always takes the next frame from the highest non-empty class, so a safety command queued behind a long burst of bulk frames
+(fence / mission upload, parameter sets) goes out as soon as the frame being written is done.
+"""
+
+import collections
+import threading
+import traceback
+
+SAFETY = 0 # Flight termination, RTL, land, disarm
+CONTROL = 1 # MANUAL_CONTROL and other real-time control
+COMMAND = 2 # Regular commands
+BULK = 3 # Transfers : mission items, fence points, parameters
+PRIORITY_NAMES = ("safety", "control", "command", "bulk")
+
+
+class OutboundScheduler:
+    # Control frames are only worth sending while fresh, older ones are dropped when more are queued
+    MAXLEN = (None, 4, None, None)
+
+    def __init__(self):
+        self.queues = [collections.deque(maxlen=maxlen) for maxlen in self.MAXLEN]
+        self.condition = threading.Condition()
+        self.sent = [0, 0, 0, 0] # Frames written per class
+        self.dropped = [0, 0, 0, 0] # Frames dropped per class (full control queue)
+        self.writing = False
+        self.writer = None
+        self.shaper = None # Optional rate limiter with delay(priority) and consumed(priority, length), see shaper
+
+    def submit(self, priority, send):
+        """
+        Queue a frame. send() runs on the writer thread, writes exactly one frame and returns its length in bytes.
+        """
+        with self.condition:
+            queue = self.queues[priority]
+            if queue.maxlen is not None and len(queue) == queue.maxlen:
+                self.dropped[priority] += 1
+            queue.append(send)
+            self.condition.notify()
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.run, name="mavlink-send", daemon=True)
+                self.writer.start()
+
+    def next(self):
+        """
+        Wait for and pop the next frame, highest class first.
+        While the shaper holds the link, the wait is interrupted by new frames so a higher class still goes first.
+        """
+        with self.condition:
+            while True:
+                for priority, queue in enumerate(self.queues):
+                    if queue:
+                        delay = self.shaper.delay(priority) if self.shaper is not None else 0
+                        if delay > 0:
+                            self.condition.wait(delay)
+                            break
+                        self.writing = True
+                        return priority, queue.popleft()
+                else:
+                    self.writing = False
+                    self.condition.notify_all()
+                    self.condition.wait()
+
+    def run(self):
+        while True:
+            priority, send = self.next()
+            try:
+                length = send()
+                self.sent[priority] += 1
+                if self.shaper is not None:
+                    self.shaper.consumed(priority, length)
+            except Exception:
+                traceback.print_exc()
+
+    def pending(self):
+        with self.condition:
+            return [len(queue) for queue in self.queues]
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued frame is written. Returns False on timeout.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.writing and not any(self.queues), timeout)
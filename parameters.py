@@ -0,0 +1,285 @@
+"""
+Bulk parameter synchronisation. The parameter protocol is documented at https://mavlink.io/en/services/parameter.html
+
+download() streams the whole set with PARAM_REQUEST_LIST, then asks for the indices that were lost with PARAM_REQUEST_READ, a window at a
+time. The result is saved to a compact cache file per vehicle, tagged with the _HASH_CHECK value of the autopilot (a CRC of every name
+and value, read with PARAM_REQUEST_READ) : on the next connection an unchanged hash loads the parameters from disk without any transfer.
+set_many() sends PARAM_SET a window at a time and confirms each value with the PARAM_VALUE echoed by the autopilot.
+Requests are written with the bulk priority of the outbound scheduler.
+"""
+
+import os
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from mavlink_dialect import mavutil
+from outbound import BULK
+
+HASH_CHECK = "_HASH_CHECK"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".dragonfly", "parameters")
+
+# Cache file : header (magic, version, _HASH_CHECK, count), then one (name, value, MAV_PARAM_TYPE) entry per parameter
+CACHE_MAGIC = b"DFPC"
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct("<4sBIH")
+CACHE_ENTRY = struct.Struct("<16sfB")
+
+FLOAT32 = struct.Struct("<f")
+UINT32 = struct.Struct("<I")
+
+
+def float32(value):
+    """
+    value rounded to the float32 sent in PARAM_SET / PARAM_VALUE.
+    """
+    return FLOAT32.unpack(FLOAT32.pack(value))[0]
+
+
+class ParameterSync:
+    """
+    Parameters of one vehicle. values is kept up to date with every PARAM_VALUE received once a transfer ran.
+    One download or set_many runs at a time, each returns a Future.
+    """
+
+    def __init__(self, protocol, window=16, timeout=1.0, retries=5, cache_dir=DEFAULT_CACHE_DIR):
+        self.protocol = protocol
+        self.window = window # Requests (or sets) in flight at once
+        self.timeout = timeout # Seconds without answer before requesting again
+        self.retries = retries
+        self.cache_dir = cache_dir # None to disable the cache
+        self.values = {} # name -> value
+        self.types = {} # name -> MAV_PARAM_TYPE
+        self.names = {} # index -> name
+        self.count = None # Parameter count reported by the autopilot
+        self.hash = None # Last _HASH_CHECK received
+        self.loaded_from_cache = False
+        self.retransmitted = 0 # Requests and sets sent again
+        self.subscription = None
+        self.lock = threading.Lock()
+        self.busy = threading.Lock() # Held by the running transfer
+        self.progress = threading.Event() # Set on every PARAM_VALUE
+        self.hash_received = threading.Event()
+        self.set_pending = {} # name -> float32 value of the sets in flight
+        self.set_confirmed = set()
+
+    def listen(self):
+        if self.subscription is None:
+            self.subscription = self.protocol.subscribe('PARAM_VALUE', self.handle_value, name="parameters")
+
+    def run(self, target, *args):
+        """
+        Run a transfer on its own thread, returns its Future.
+        """
+        if not self.busy.acquire(blocking=False):
+            raise RuntimeError("A parameter transfer is already running")
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def transfer():
+            try:
+                future.set_result(target(*args))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self.busy.release()
+
+        self.listen()
+        threading.Thread(target=transfer, name="parameter-sync", daemon=True).start()
+        return future
+
+    def handle_value(self, msg):
+        if not self.protocol.is_vehicle_heartbeat(msg):
+            return
+        name = msg.param_id
+        if name == HASH_CHECK:
+            # The CRC is sent as the bits of the float value
+            self.hash = UINT32.unpack(FLOAT32.pack(msg.param_value))[0]
+            self.hash_received.set()
+            return
+        with self.lock:
+            self.values[name] = msg.param_value
+            self.types[name] = msg.param_type
+            if 0 <= msg.param_index < msg.param_count:
+                self.names[msg.param_index] = name
+                self.count = msg.param_count
+            if self.set_pending.get(name) == float32(msg.param_value):
+                del self.set_pending[name]
+                self.set_confirmed.add(name)
+        self.progress.set()
+
+    def send(self, msg):
+        self.protocol.send_message(msg, BULK)
+
+    def request_read(self, name=b"", index=-1):
+        self.send(self.protocol.vehicle.mav.param_request_read_encode(
+            self.protocol.TARGET_SYSTEM, self.protocol.TARGET_COMPONENT, name, index
+        ))
+
+    def request_list(self):
+        self.send(self.protocol.vehicle.mav.param_request_list_encode(self.protocol.TARGET_SYSTEM, self.protocol.TARGET_COMPONENT))
+
+    def read_hash(self):
+        """
+        _HASH_CHECK of the autopilot, None if it does not answer.
+        """
+        for attempt in range(2):
+            self.hash_received.clear()
+            self.request_read(HASH_CHECK.encode())
+            if self.hash_received.wait(self.timeout):
+                return self.hash
+        return None
+
+    # Download
+
+    def download(self, use_cache=True):
+        """
+        Fetch every parameter. Returns a Future resolved with {name: value}, loaded from the cache when the _HASH_CHECK is unchanged.
+        """
+        return self.run(self.download_parameters, use_cache)
+
+    def download_parameters(self, use_cache):
+        parameter_hash = self.read_hash() if use_cache and self.cache_dir else None
+        if parameter_hash is not None and self.load_cache(parameter_hash):
+            return dict(self.values)
+
+        self.loaded_from_cache = False
+        with self.lock:
+            self.names = {}
+            self.count = None
+        self.progress.clear()
+        self.request_list()
+
+        outstanding = set() # Indices requested one by one and not received yet
+        rerequesting = False # The list stream is over, the missing indices are requested one by one
+        stalls = 0
+        while True:
+            received = self.progress.wait(self.timeout)
+            self.progress.clear()
+            with self.lock:
+                count = self.count
+                missing = [index for index in range(count) if index not in self.names] if count is not None else None
+            if missing == []:
+                break
+            if received:
+                stalls = 0
+                if not rerequesting:
+                    continue
+            else:
+                stalls += 1
+                if stalls > self.retries:
+                    raise TimeoutError(f"Parameter download stalled, {len(missing) if missing else 'all'} parameters missing")
+                if missing is None:
+                    self.request_list()
+                    continue
+                self.retransmitted += len(outstanding)
+                outstanding = set()
+                rerequesting = True
+
+            outstanding.intersection_update(missing)
+            for index in missing:
+                if len(outstanding) >= self.window:
+                    break
+                if index not in outstanding:
+                    self.request_read(index=index)
+                    outstanding.add(index)
+
+        if parameter_hash is not None and self.read_hash() == parameter_hash:
+            self.save_cache(parameter_hash)
+        return dict(self.values)
+
+    # Cache
+
+    def cache_path(self):
+        return os.path.join(self.cache_dir, f"{self.protocol.TARGET_SYSTEM}_{self.protocol.TARGET_COMPONENT}.params")
+
+    def load_cache(self, parameter_hash):
+        """
+        Load the cached parameters if they were saved with parameter_hash. Returns False if there is no such cache.
+        """
+        try:
+            with open(self.cache_path(), "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) < CACHE_HEADER.size:
+            return False
+        magic, version, cached_hash, count = CACHE_HEADER.unpack_from(data)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION or cached_hash != parameter_hash:
+            return False
+        if len(data) != CACHE_HEADER.size + count * CACHE_ENTRY.size:
+            return False
+
+        with self.lock:
+            self.values = {}
+            self.types = {}
+            self.names = {}
+            for index, (name, value, param_type) in enumerate(CACHE_ENTRY.iter_unpack(memoryview(data)[CACHE_HEADER.size:])):
+                name = name.rstrip(b"\0").decode()
+                self.values[name] = value
+                self.types[name] = param_type
+                self.names[index] = name
+            self.count = count
+        self.loaded_from_cache = True
+        return True
+
+    def save_cache(self, parameter_hash):
+        with self.lock:
+            names = [self.names[index] for index in range(self.count)]
+            data = bytearray(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, parameter_hash, len(names)))
+            for name in names:
+                data += CACHE_ENTRY.pack(name.encode(), self.values[name], self.types[name])
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.cache_path()
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    # Set
+
+    def set_many(self, values):
+        """
+        Set several parameters ({name: value}). Returns a Future resolved with the list of the names that could not be confirmed
+        (the autopilot never echoed the new value), empty on success.
+        """
+        return self.run(self.set_parameters, dict(values))
+
+    def send_set(self, name, value):
+        param_type = self.types.get(name, mavutil.mavlink.MAV_PARAM_TYPE_REAL32)
+        self.send(self.protocol.vehicle.mav.param_set_encode(
+            self.protocol.TARGET_SYSTEM, self.protocol.TARGET_COMPONENT, name.encode(), value, param_type
+        ))
+
+    def set_parameters(self, values):
+        waiting = list(values) # Names not sent yet
+        in_flight = {} # name -> (time sent, attempts)
+        failed = []
+        with self.lock:
+            self.set_confirmed = set()
+        self.progress.clear()
+
+        while waiting or in_flight:
+            with self.lock:
+                for name in self.set_confirmed:
+                    in_flight.pop(name, None)
+                self.set_confirmed = set()
+                now = time.monotonic()
+                for name, (sent, attempts) in list(in_flight.items()):
+                    if now - sent > self.timeout:
+                        if attempts < self.retries:
+                            self.retransmitted += 1
+                            in_flight[name] = (now, attempts + 1)
+                            self.send_set(name, values[name])
+                        else:
+                            del in_flight[name]
+                            self.set_pending.pop(name, None)
+                            failed.append(name)
+                while waiting and len(in_flight) < self.window:
+                    name = waiting.pop(0)
+                    self.set_pending[name] = float32(values[name])
+                    in_flight[name] = (now, 1)
+                    self.send_set(name, values[name])
+            if in_flight:
+                self.progress.wait(self.timeout / 4)
+                self.progress.clear()
+        return failed
@@ -0,0 +1,120 @@
+"""
+Compact recording and deterministic replay of the sampled joystick stream.
+
+File layout (little endian) :
+    header: magic b"DFJR", uint8 version, uint8 number of axes
+    frames: uint32 time since the start of the recording (ms), int16 per axis (in controller.Mapping.AXIS_NAMES order), uint32 button bitmask
+A recording can be replayed through controller.Mapping.handle_event without pygame or a physical controller.
+"""
+
+import argparse
+import struct
+import time
+from controller import Mapping
+
+MAGIC = b"DFJR"
+VERSION = 1
+HEADER = struct.Struct("<4sBB")
+
+
+def frame_struct(num_axes):
+    return struct.Struct(f"<I{num_axes}hI")
+
+
+class Recorder:
+    """
+    Append joystick snapshots to a preallocated bytearray and flush it to disk in large writes.
+    """
+
+    def __init__(self, path, axis_names=tuple(Mapping.AXIS_NAMES.values()), flush_frames=1024):
+        self.axis_names = axis_names
+        self.frame = frame_struct(len(axis_names))
+        self.buffer = bytearray(self.frame.size * flush_frames)
+        self.offset = 0
+        self.start = time.monotonic()
+        self.frames = 0
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(axis_names)))
+
+    def record(self, joystick_values, buttons):
+        timestamp = int((time.monotonic() - self.start) * 1000)
+        axes = [int(joystick_values.get(name, 0)) for name in self.axis_names]
+        self.frame.pack_into(self.buffer, self.offset, timestamp, *axes, buttons & 0xFFFFFFFF)
+        self.offset += self.frame.size
+        self.frames += 1
+        if self.offset == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        self.file.write(memoryview(self.buffer)[:self.offset])
+        self.offset = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_recording(path):
+    """
+    Returns the axis count and a memoryview over the frames of a recording.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, num_axes = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a joystick recording (version {VERSION})")
+    return num_axes, memoryview(data)[HEADER.size:]
+
+
+def replay(path, mapping, realtime=True):
+    """
+    Feed a recording through mapping.handle_event, either at the recorded pace (realtime) or as fast as possible.
+    Returns the number of frames replayed.
+    """
+    num_axes, frames = read_recording(path)
+    axis_names = tuple(Mapping.AXIS_NAMES.values())[:num_axes]
+    frame = frame_struct(num_axes)
+
+    start = time.monotonic()
+    count = 0
+    for values in frame.iter_unpack(frames[:len(frames) - len(frames) % frame.size]):
+        if realtime:
+            delay = values[0] / 1000 - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        mapping.buttons = values[-1]
+        mapping.handle_event(dict(zip(axis_names, values[1:-1])), mapping.commands.latency.now())
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay the joystick stream.")
+    parser.add_argument("action", choices=["record", "replay"])
+    parser.add_argument("path")
+    parser.add_argument("--port", required=True, help="MAVLink connection string, ex : udpout:127.0.0.1:14550")
+    parser.add_argument("--baud", type=int, default=57600)
+    parser.add_argument("--fast", action="store_true", help="Replay as fast as possible instead of in real time")
+    args = parser.parse_args()
+
+    from command_protocol import Protocol
+    control = Mapping(commands=Protocol(args.port, args.baud))
+    if args.action == "record":
+        with Recorder(args.path) as control.recorder:
+            control.sample()
+    else:
+        control.scheduler.start()
+        count = replay(args.path, control, realtime=not args.fast)
+        control.scheduler.stop()
+        print(f"{count} frames replayed")
+        print(control.commands.latency.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Token-bucket shaper for the outbound link, driven by the RADIO_STATUS feedback of SiK-style radios.
+
+The writer of the OutboundScheduler waits for tokens before every frame and pays for its length once written, so the link is fed at the
+rate the radio can actually carry instead of overflowing its buffer. The rate follows the radio feedback :
+    txbuf (free space in the radio transmit buffer, %) : low -> multiplicative decrease, high -> additive increase
+    remrssi (signal received by the remote radio) : a weak link caps the rate
+Safety frames never wait, they are paid for afterwards.
+"""
+
+import threading
+import time
+from outbound import PRIORITY_NAMES, SAFETY
+
+
+class LinkShaper:
+    TXBUF_LOW = 20 # Free radio buffer (%) under which the rate is halved
+    TXBUF_MEDIUM = 50 # Free radio buffer (%) under which the rate is reduced by a quarter
+    TXBUF_HIGH = 90 # Free radio buffer (%) over which the rate grows
+    RSSI_GOOD = 100 # remrssi from which the link is considered at full capacity (SiK units)
+    RSSI_FLOOR = 0.25 # Minimum fraction of max_rate allowed on a weak link
+
+    def __init__(self, rate=4000, min_rate=500, max_rate=8000, burst=512):
+        self.rate = rate # Current rate, bytes / s
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst # Bucket size, bytes
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.ceiling = max_rate # max_rate reduced by the remote RSSI
+        self.radio_status = None # Last RADIO_STATUS
+        self.bytes = [0] * len(PRIORITY_NAMES) # Bytes written per priority class
+        self.frames = [0] * len(PRIORITY_NAMES) # Frames written per priority class
+        self.lock = threading.Lock()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, priority):
+        """
+        Seconds to wait before a frame of this priority may be written, 0 to write it now.
+        """
+        if priority == SAFETY:
+            return 0
+        with self.lock:
+            self.refill(time.monotonic())
+            return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def consumed(self, priority, length):
+        """
+        Pay for a written frame, the bucket may go negative (the next frames wait).
+        """
+        with self.lock:
+            self.refill(time.monotonic())
+            self.tokens -= length
+            self.bytes[priority] += length
+            self.frames[priority] += 1
+
+    def handle_radio_status(self, msg):
+        with self.lock:
+            self.radio_status = msg
+            if msg.remrssi:
+                self.ceiling = self.max_rate * max(self.RSSI_FLOOR, min(1.0, msg.remrssi / self.RSSI_GOOD))
+
+            if msg.txbuf < self.TXBUF_LOW:
+                rate = self.rate * 0.5
+            elif msg.txbuf < self.TXBUF_MEDIUM:
+                rate = self.rate * 0.75
+            elif msg.txbuf > self.TXBUF_HIGH:
+                rate = self.rate + self.min_rate / 4
+            else:
+                rate = self.rate
+            self.refill(time.monotonic())
+            self.rate = max(self.min_rate, min(rate, self.ceiling))
+
+    def stats(self):
+        """
+        {priority class: (frames, bytes)} written through the shaper.
+        """
+        return {name: (self.frames[i], self.bytes[i]) for i, name in enumerate(PRIORITY_NAMES)}
@@ -0,0 +1,107 @@
+"""
+Stream-rate negotiation with MAV_CMD_SET_MESSAGE_INTERVAL.
+
+Subscribers declare the rate they need (Protocol.subscribe(..., rate_hz=...)). The StreamManager requests exactly the highest declared
+rate of every subscribed type and disables the periodic streams without any subscriber, so the link only carries what the GCS consumes.
+It is driven by the HEARTBEAT of the vehicle : every heartbeat picks up new subscriptions and newly seen streams, and a heartbeat after
+a silence longer than reconnect_timeout re-applies the whole configuration.
+"""
+
+import time
+from mavlink_dialect import mavutil
+from dispatcher import ALL_MESSAGES
+
+# Messages that must never be turned off, event driven or needed by the protocols themselves
+NEVER_DISABLE = frozenset([
+    'HEARTBEAT', 'COMMAND_ACK', 'STATUSTEXT', 'PARAM_VALUE', 'MISSION_COUNT', 'MISSION_ITEM_INT', 'MISSION_REQUEST',
+    'MISSION_REQUEST_INT', 'MISSION_ACK', 'MISSION_CURRENT', 'MESSAGE_INTERVAL', 'TIMESYNC', 'RADIO_STATUS', 'TERRAIN_REQUEST',
+    'TERRAIN_REPORT', 'AUTOPILOT_VERSION', 'PROTOCOL_VERSION',
+])
+
+
+def has_message_id(msg_type):
+    return getattr(mavutil.mavlink, 'MAVLINK_MSG_ID_' + msg_type, None) is not None
+
+
+class StreamManager:
+
+    def __init__(self, protocol, reconnect_timeout=3.0, stream_max_age=5.0):
+        self.protocol = protocol
+        self.reconnect_timeout = reconnect_timeout # Heartbeat silence after which the vehicle is considered reconnected
+        self.stream_max_age = stream_max_age # Seconds since the last message for a type to count as a live stream
+        self.applied = {} # message type -> rate (Hz) requested from the vehicle
+        self.disabled = set() # message types turned off
+        self.last_heartbeat = None
+        self.subscription = None
+
+    def required_rates(self):
+        """
+        {message type: Hz}, the highest rate declared by the subscribers of each type.
+        """
+        rates = {}
+        for msg_type, subscriptions in self.protocol.dispatcher.subscriptions.items():
+            for subscription in subscriptions:
+                if subscription.rate_hz:
+                    rates[msg_type] = max(rates.get(msg_type, 0), subscription.rate_hz)
+        return rates
+
+    def set_interval(self, msg_type, interval_us):
+        return self.protocol.mav_cmd_set_message_interval(getattr(mavutil.mavlink, 'MAVLINK_MSG_ID_' + msg_type), interval_us, 0)
+
+    def apply(self):
+        """
+        Request the missing or changed rates and disable the unwanted live streams. Returns {message type: CommandFuture} of the commands sent.
+        """
+        futures = {}
+        # Types outside of the dialect (UNKNOWN_<id> messages of pymavlink) have no message id to configure
+        required = {msg_type: rate for msg_type, rate in self.required_rates().items() if has_message_id(msg_type)}
+        for msg_type, rate in required.items():
+            if self.applied.get(msg_type) != rate:
+                futures[msg_type] = self.set_interval(msg_type, int(1e6 / rate))
+                self.applied[msg_type] = rate
+                self.disabled.discard(msg_type)
+
+        # Rates nobody needs anymore go back to the default of the vehicle
+        for msg_type in [msg_type for msg_type in self.applied if msg_type not in required]:
+            futures[msg_type] = self.set_interval(msg_type, 0)
+            del self.applied[msg_type]
+
+        # Types subscribed by name are consumed even without a declared rate, ALL_MESSAGES subscribers (ex : telemetry) do not count
+        subscribed = self.protocol.dispatcher.subscribed_types() - {ALL_MESSAGES}
+        for msg_type in self.disabled & subscribed:
+            futures[msg_type] = self.set_interval(msg_type, 0)
+            self.disabled.discard(msg_type)
+
+        now = time.monotonic()
+        for msg_type, entry in self.protocol.telemetry.snapshot().items():
+            live = entry.interval is not None and now - entry.timestamp < self.stream_max_age
+            if (live and msg_type not in subscribed and msg_type not in self.disabled and msg_type not in NEVER_DISABLE
+                    and has_message_id(msg_type)):
+                futures[msg_type] = self.set_interval(msg_type, -1)
+                self.disabled.add(msg_type)
+        return futures
+
+    def reset(self):
+        """
+        Forget what was applied, the next apply sends the whole configuration again.
+        """
+        self.applied.clear()
+        self.disabled.clear()
+
+    def handle_heartbeat(self, msg):
+        if msg.get_srcSystem() != self.protocol.TARGET_SYSTEM:
+            return
+        now = time.monotonic()
+        if self.last_heartbeat is not None and now - self.last_heartbeat > self.reconnect_timeout:
+            self.reset()
+        self.last_heartbeat = now
+        self.apply()
+
+    def start(self):
+        if self.subscription is None:
+            self.subscription = self.protocol.subscribe('HEARTBEAT', self.handle_heartbeat, name="stream manager")
+
+    def stop(self):
+        if self.subscription is not None:
+            self.protocol.dispatcher.unsubscribe(self.subscription)
+            self.subscription = None
@@ -0,0 +1,91 @@
+"""
+Survey grid planner : lawnmower transects over an area, flown with the camera triggered by distance.
+
+Transects are parallel lines spaced by the camera footprint across track minus the side overlap. They are clipped to the area polygon with
+NumPy, a chunk of lines at a time against every edge, and turned into mission items as they are produced : only one chunk of
+geometry is held in memory, whatever the size of the area.
+Every segment inside the area is flown as
+    waypoint at the start, MAV_CMD_DO_SET_CAM_TRIGG_DIST (distance between photos), waypoint at the end, MAV_CMD_DO_SET_CAM_TRIGG_DIST 0
+in alternate directions, so no photo is taken during the turns.
+    items = survey_items(area, footprint=(60, 40), altitude=80, overlap=0.7, sidelap=0.6)
+    protocol.missions.upload([home] + list(items))
+"""
+
+import math
+import numpy as np
+from fence import to_global, to_local
+from mission import MissionBuilder
+
+
+def transects(xy, spacing, angle=0.0, overshoot=0.0, chunk=64):
+    """
+    Lawnmower segments over the polygon xy (local metres), along the direction angle (degrees clockwise from north).
+    Yields ((x, y) start, (x, y) end) segments in flight order, overshoot metres past the boundary at both ends.
+    """
+    if not spacing > 0:
+        raise ValueError(f"Transect spacing must be > 0 m, got {spacing}")
+    # Rotate so the transects are horizontal lines y = constant
+    theta = math.radians(90 - angle)
+    rotation = np.array([[math.cos(theta), math.sin(theta)], [-math.sin(theta), math.cos(theta)]])
+    rotated = xy @ rotation.T
+    a = rotated
+    b = np.roll(rotated, -1, axis=0)
+    lines = np.arange(rotated[:, 1].min() + spacing / 2, rotated[:, 1].max(), spacing)
+
+    forward = True
+    for first in range(0, len(lines), chunk):
+        y = lines[first:first + chunk, None] # (lines, 1) against (edges,)
+        # Edges crossing each line, half-open so a vertex on a line is counted once
+        crossing = (a[:, 1] <= y) != (b[:, 1] <= y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = a[:, 0] + (y - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+        x = np.where(crossing, x, np.inf)
+        x.sort(axis=1)
+        counts = crossing.sum(axis=1)
+
+        for line, count in enumerate(counts):
+            xs = x[line, :count]
+            segments = [(xs[i] - overshoot, xs[i + 1] + overshoot) for i in range(0, count - 1, 2)]
+            if not forward:
+                segments = [(end, start) for start, end in reversed(segments)]
+            if segments:
+                forward = not forward
+            for start, end in segments:
+                points = np.array([[start, y[line, 0]], [end, y[line, 0]]]) @ rotation
+                yield tuple(points[0]), tuple(points[1])
+
+
+def survey_items(area, footprint, altitude, overlap=0.7, sidelap=0.6, angle=0.0, overshoot=0.0, chunk=64):
+    """
+    MissionItems of a survey of area ([(latitude, longitude), ...]), produced lazily.
+        footprint: (across track, along track) size of a photo on the ground at altitude, metres
+        overlap: Fraction of a photo covered by the next one along the track
+        sidelap: Fraction of a photo covered by the neighbouring transect
+        angle: Direction of the transects, degrees clockwise from north
+    ValueError, when called, if the parameters give no transect spacing, no distance between photos or an altitude <= 0.
+    """
+    across, along = footprint
+    spacing = across * (1 - sidelap)
+    trigger_distance = along * (1 - overlap)
+    if not spacing > 0:
+        raise ValueError(f"sidelap {sidelap} and footprint across track {across} m give a transect spacing of {spacing} m, it must be > 0")
+    if not trigger_distance > 0:
+        raise ValueError(f"overlap {overlap} and footprint along track {along} m give a trigger distance of {trigger_distance} m, it must be > 0")
+    if not altitude > 0:
+        raise ValueError(f"altitude must be > 0 m, got {altitude}")
+    return survey_generator(area, spacing, trigger_distance, altitude, angle, overshoot, chunk)
+
+
+def survey_generator(area, spacing, trigger_distance, altitude, angle, overshoot, chunk):
+    area = np.asarray(area, dtype=float)
+    origin = area.mean(axis=0)
+    xy = to_local(area, origin)
+
+    builder = MissionBuilder()
+    for start, end in transects(xy, spacing, angle, overshoot, chunk):
+        (start_latitude, start_longitude), (end_latitude, end_longitude) = to_global(np.array([start, end]), origin)
+        yield builder.mav_cmd_nav_waypoint(0, 0, 0, float('nan'), float(start_latitude), float(start_longitude), altitude)
+        yield builder.mav_cmd_do_set_cam_trigg_dist(trigger_distance, 0, 1)
+        yield builder.mav_cmd_nav_waypoint(0, 0, 0, float('nan'), float(end_latitude), float(end_longitude), altitude)
+        yield builder.mav_cmd_do_set_cam_trigg_dist(0, 0, 0)
+        builder.items.clear()
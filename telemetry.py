@@ -0,0 +1,67 @@
+"""
+Latest-value telemetry cache.
+
+The receive loop stores the last message of every type with its receive time and an estimate of its rate. Each entry is an immutable
+tuple replaced in a single dict assignment by the receive thread, so readers get a consistent snapshot without taking any lock.
+"""
+
+import time
+from collections import namedtuple
+
+TelemetryEntry = namedtuple("TelemetryEntry", ["msg", "timestamp", "interval"]) # interval : smoothed seconds between two messages, None until the second one
+
+
+class TelemetryCache:
+    RATE_SMOOTHING = 0.1 # Weight of the last interval in the rate estimate
+
+    def __init__(self):
+        self.entries = {} # message type -> TelemetryEntry
+
+    def update(self, msg):
+        """
+        Store a received message, called from the receive thread only.
+        """
+        now = time.monotonic()
+        msg_type = msg.get_type()
+        previous = self.entries.get(msg_type)
+        if previous is None:
+            interval = None
+        elif previous.interval is None:
+            interval = now - previous.timestamp
+        else:
+            interval = previous.interval + self.RATE_SMOOTHING * (now - previous.timestamp - previous.interval)
+        self.entries[msg_type] = TelemetryEntry(msg, now, interval)
+
+    def entry(self, msg_type):
+        return self.entries.get(msg_type)
+
+    def get(self, msg_type, max_age=None):
+        """
+        Last message of a type, None if none was received (or if it is older than max_age seconds).
+        """
+        entry = self.entries.get(msg_type)
+        if entry is None or (max_age is not None and time.monotonic() - entry.timestamp > max_age):
+            return None
+        return entry.msg
+
+    def age(self, msg_type):
+        """
+        Seconds since the last message of a type was received, None if none was.
+        """
+        entry = self.entries.get(msg_type)
+        return None if entry is None else time.monotonic() - entry.timestamp
+
+    def rate(self, msg_type):
+        """
+        Estimated receive rate of a type in Hz, 0 if unknown.
+        """
+        entry = self.entries.get(msg_type)
+        if entry is None or not entry.interval:
+            return 0.0
+        return 1.0 / entry.interval
+
+    def snapshot(self):
+        """
+        Consistent copy of every entry : {message type: TelemetryEntry}.
+        """
+        return self.entries.copy()
@@ -0,0 +1,184 @@
+"""
+Terrain server : answer the TERRAIN_REQUEST of ArduPilot with TERRAIN_DATA sampled from local SRTM tiles.
+The terrain protocol is documented at https://ardupilot.org/dev/docs/terrain-following.html and https://mavlink.io/en/messages/common.html#TERRAIN_REQUEST
+
+A TERRAIN_REQUEST covers a grid of 8 x 7 blocks of 4 x 4 points, grid_spacing metres apart, from its lat / lon (south-west corner). Each
+bit of its 56-bit mask asks for one block, answered by one TERRAIN_DATA. SRTM .hgt tiles (1 x 1 degree, big-endian int16 metres, named
+after their south-west corner like N48E002.hgt) are opened with mmap, so only the pages actually sampled are read from disk. Decoded
+blocks are kept in an LRU : the autopilot repeats its requests until every block arrived, and neighbouring requests share blocks.
+Blocks are sampled on the writer thread when their frame is about to be sent, with the bulk priority of the outbound scheduler,
+and a block already queued is not queued again by a repeated request. A TERRAIN_CHECK sent by the vehicle is answered with a
+TERRAIN_REPORT of the DEM height.
+    terrain = TerrainServer(protocol, "~/srtm")
+    terrain.start()
+"""
+
+import functools
+import math
+import mmap
+import os
+import threading
+import numpy as np
+from outbound import BULK
+
+EARTH_RADIUS = 6378137.0 # metres
+HGT_VOID = -32768 # SRTM samples without data
+GRID_BLOCKS = 56 # Blocks of a TERRAIN_REQUEST (8 east x 7 north)
+
+
+def offset(latitude, longitude, east, north):
+    """
+    Position east / north metres away (flat earth, as the autopilot does over a terrain grid).
+    """
+    latitude = latitude + np.degrees(north / EARTH_RADIUS)
+    longitude = longitude + np.degrees(east / (EARTH_RADIUS * np.cos(np.radians(latitude))))
+    return latitude, longitude
+
+
+class SRTMTiles:
+    """
+    Elevation from the .hgt tiles of a directory, each tile memory-mapped on first use.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.expanduser(directory)
+        self.tiles = {} # (latitude, longitude) of the south-west corner -> int16 array over the mmap, None if there is no tile
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def tile_name(latitude, longitude):
+        return f"{'N' if latitude >= 0 else 'S'}{abs(latitude):02d}{'E' if longitude >= 0 else 'W'}{abs(longitude):03d}.hgt"
+
+    def tile(self, latitude, longitude):
+        key = (latitude, longitude)
+        if key not in self.tiles:
+            with self.lock:
+                if key not in self.tiles:
+                    self.tiles[key] = self.open_tile(latitude, longitude)
+        return self.tiles[key]
+
+    def open_tile(self, latitude, longitude):
+        path = os.path.join(self.directory, self.tile_name(latitude, longitude))
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        size = math.isqrt(len(data) // 2) # 1201 (3 arc-second) or 3601 (1 arc-second) samples per side
+        if size * size * 2 != len(data):
+            return None
+        return np.frombuffer(data, dtype=">i2").reshape(size, size) # Row 0 is the north edge
+
+    def elevations(self, latitudes, longitudes):
+        """
+        Bilinear elevation (metres) of arrays of positions, NaN where there is no data.
+        """
+        result = np.full(np.shape(latitudes), np.nan)
+        tile_latitudes = np.floor(latitudes).astype(int)
+        tile_longitudes = np.floor(longitudes).astype(int)
+        for tile_latitude, tile_longitude in set(zip(tile_latitudes.flat, tile_longitudes.flat)):
+            samples = self.tile(tile_latitude, tile_longitude)
+            if samples is None:
+                continue
+            inside = (tile_latitudes == tile_latitude) & (tile_longitudes == tile_longitude)
+            last = samples.shape[0] - 1
+            row = (tile_latitude + 1 - latitudes[inside]) * last
+            column = (longitudes[inside] - tile_longitude) * last
+            row0 = np.minimum(row.astype(int), last - 1)
+            column0 = np.minimum(column.astype(int), last - 1)
+            fy = row - row0
+            fx = column - column0
+            corners = np.stack((
+                samples[row0, column0], samples[row0, column0 + 1], samples[row0 + 1, column0], samples[row0 + 1, column0 + 1],
+            )).astype(float)
+            corners[corners == HGT_VOID] = np.nan
+            result[inside] = (
+                corners[0] * (1 - fx) * (1 - fy) + corners[1] * fx * (1 - fy) + corners[2] * (1 - fx) * fy + corners[3] * fx * fy
+            )
+        return result
+
+
+class TerrainServer:
+
+    def __init__(self, protocol, directory, cache_blocks=4096):
+        self.protocol = protocol
+        self.tiles = SRTMTiles(directory)
+        self.block = functools.lru_cache(maxsize=cache_blocks)(self.sample_block) # block(lat, lon, grid_spacing, bit), decoded blocks LRU
+        self.queued = set() # (lat, lon, grid_spacing, bit) of the TERRAIN_DATA waiting in the outbound queue
+        self.lock = threading.Lock()
+        self.sent = 0 # TERRAIN_DATA sent
+        self.missing = 0 # Blocks requested outside of the tiles
+        self.subscriptions = []
+
+    def start(self):
+        if not self.subscriptions:
+            self.subscriptions = [
+                self.protocol.subscribe('TERRAIN_REQUEST', self.handle_request, name="terrain"),
+                self.protocol.subscribe('TERRAIN_CHECK', self.handle_check, name="terrain"),
+            ]
+
+    def stop(self):
+        for subscription in self.subscriptions:
+            self.protocol.dispatcher.unsubscribe(subscription)
+        self.subscriptions = []
+
+    def sample_block(self, lat, lon, grid_spacing, bit):
+        """
+        The 16 int16 heights of a block, None if a point has no data. Point i is (i // 4) spacings north and (i % 4) spacings east
+        of the block corner, the block corner is (bit // 8) blocks north and (bit % 8) blocks east of the grid corner.
+        """
+        block_spacing = grid_spacing * 4
+        latitude, longitude = offset(lat * 1e-7, lon * 1e-7, block_spacing * (bit % 8), block_spacing * (bit // 8))
+        points = np.arange(16)
+        latitudes, longitudes = offset(latitude, longitude, grid_spacing * (points % 4), grid_spacing * (points // 4))
+        heights = self.tiles.elevations(latitudes, longitudes)
+        if np.isnan(heights).any():
+            return None
+        return tuple(int(height) for height in np.round(heights))
+
+    def handle_request(self, msg):
+        if not self.protocol.is_vehicle_heartbeat(msg):
+            return
+        for bit in range(GRID_BLOCKS):
+            if msg.mask & (1 << bit):
+                key = (msg.lat, msg.lon, msg.grid_spacing, bit)
+                with self.lock:
+                    if key in self.queued:
+                        continue
+                    self.queued.add(key)
+                self.protocol.outbound.submit(BULK, functools.partial(self.send_block, key))
+
+    def send_block(self, key):
+        """
+        Write the TERRAIN_DATA of a block from the writer thread. Returns its length, 0 if there is no data for it.
+        """
+        data = self.block(*key)
+        with self.lock:
+            self.queued.discard(key)
+        if data is None:
+            self.missing += 1
+            return 0
+        lat, lon, grid_spacing, bit = key
+        msg = self.protocol.vehicle.mav.terrain_data_encode(lat, lon, grid_spacing, bit, data)
+        self.protocol.vehicle.mav.send(msg)
+        self.sent += 1
+        return len(msg.get_msgbuf())
+
+    def handle_check(self, msg):
+        """
+        Answer a TERRAIN_CHECK of the vehicle with the DEM height. MAVLink defines TERRAIN_CHECK as sent by the GCS and answered by
+        the vehicle : only the checks of the vehicle itself are answered, never the ones of another GCS sharing the link.
+        """
+        if not self.protocol.is_vehicle_heartbeat(msg):
+            return
+        height = self.tiles.elevations(np.array([msg.lat * 1e-7]), np.array([msg.lon * 1e-7]))[0]
+        if np.isnan(height):
+            return
+        self.protocol.send_message(self.protocol.vehicle.mav.terrain_report_encode(
+            msg.lat, msg.lon,
+            0, # spacing, the heights come from the DEM and not from a grid
+            float(height), # terrain_height
+            0, # current_height, the GCS has no vehicle position to report
+            0, # pending
+            0, # loaded
+        ), BULK)
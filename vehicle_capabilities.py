@@ -1,14 +1,13 @@
 import json
 import os
-import time
-import requests
 import xml.etree.ElementTree as ET
-import pymavlink.dialects.v20 as mavlink
-from pymavlink import mavutil
+from mavlink_dialect import mavutil
 
 
 @staticmethod
 def get_common_enums_commands_messages(): 
+    import requests
+
     # Fetch the MAVLink common message definitions XML file from GitHub
     url = 'https://raw.githubusercontent.com/mavlink/mavlink/master/message_definitions/v1.0/common.xml'
     response = requests.get(url)
@@ -24,15 +23,13 @@ def get_common_enums_commands_messages():
 
 def available_enums_commands_messages(self, enums, commands, messages):
 
-    while True:
-        msg = self.vehicle.recv_match(type='HEARTBEAT', blocking=True)
-        if msg:
-            break
-        time.sleep(0.1)
+    # Wait for the vehicle through the receive loop of the Protocol instead of reading the connection directly
+    self.wait_message('HEARTBEAT')
 
-    supported_enums = [enum for enum in enums if enum in mavlink.MAVLINK_MESSAGE_INFO]
-    supported_commands = [command for command in commands if command in mavlink.MAV_CMD]
-    supported_messages = [message for message in messages if message in mavlink.MAVLINK_MESSAGE_INFO]
+    # Checked against the dialect already loaded by the connection instead of importing another one
+    supported_enums = [enum for enum in enums if enum in mavutil.mavlink.enums]
+    supported_commands = [command for command in commands if hasattr(mavutil.mavlink, command)]
+    supported_messages = [message for message in messages if hasattr(mavutil.mavlink, 'MAVLINK_MSG_ID_' + message)]
 
     return supported_enums, supported_commands, supported_messages
 